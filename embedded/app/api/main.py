@@ -27,6 +27,7 @@ from app.api.routers.debug import router as debug_router
 from app.api.routers.training import router as training_router
 from app.core.db import engine, Base, SessionLocal
 from app.core.dal import get_tokens
+from app.training.datasets import flush_training_writes
 import asyncio
 from app.biometrics.fitbit_client import FitbitClient
 from app.voice.listener import VoiceIntentListener, ListenerConfig
@@ -82,6 +83,7 @@ async def lifespan(app: FastAPI):
         except Exception as exc:  # pragma: no cover
             logger.warning("Error deteniendo voice listener: {}", exc)
         delattr(app.state, "voice_listener")
+    flush_training_writes()
 
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
@@ -66,7 +66,7 @@ def mjpeg_frames(overlay: bool = True, app_state=None) -> Iterator[bytes]:
         ]
 
         while True:
-            ok, frame = cap.read()
+            ok, frame = pose_estimator.read_frame()
             if not ok:
                 time.sleep(0.1)
                 continue
@@ -207,7 +207,7 @@ async def snapshot() -> Response:
     import numpy as np  # type: ignore
     cap = pose_estimator.cap
     if cap is not None:
-        ok, frame = cap.read()
+        ok, frame = pose_estimator.read_frame()
         if ok:
             ret, buf = cv2.imencode('.jpg', frame)
             if ret:
@@ -455,7 +455,7 @@ async def reports_view() -> HTMLResponse:
 
 @router.get("/debug/metrics")
 async def metrics() -> JSONResponse:
-    p50, p95 = pose_estimator.get_latency_p50_p95_ms()
+    p50, p95 = pose_estimator.get_latency_p50_p95_ms(exact=True)
     last_dt = getattr(pose_estimator, "_last_latency", 0.0)
     payload = {
         "latency_ms": {"p50": round(p50, 2), "p95": round(p95, 2)},
@@ -4,7 +4,7 @@ Uses the vision module to compute pose keypoints and feedback.
 """
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from loguru import logger
 
 from app.api.schemas import Envelope, PostureInput, PostureOutput
@@ -21,6 +21,8 @@ async def posture_endpoint(payload: PostureInput) -> Envelope:
 
     For now, this pulls from the camera internally and returns dummy joints.
     """
+    # /posture drives the HUD (inline frame or frame_id for /posture/frame): keep it encoding
+    pose_estimator.mark_hud_read()
     result = pose_estimator.analyze_frame()
     logger.info(
         "posture fps={} reps={} phase={} latency_p95={}",
@@ -31,3 +33,16 @@ async def posture_endpoint(payload: PostureInput) -> Envelope:
     )
     payload = PostureOutput.model_validate(result.to_dict())
     return Envelope(success=True, data=payload.model_dump())
+
+
+@router.get("/posture/frame")
+async def posture_frame() -> Response:
+    """Return the latest HUD frame as raw JPEG bytes (no base64).
+
+    The ``X-Frame-Id`` header matches ``frame_id`` in the ``/posture`` payload so
+    clients only download frames they have not shown yet. 204 when no frame exists.
+    """
+    frame_id, jpeg = pose_estimator.get_hud_jpeg()
+    if jpeg is None:
+        return Response(status_code=204)
+    return Response(content=jpeg, media_type="image/jpeg", headers={"X-Frame-Id": str(frame_id)})
@@ -265,7 +265,7 @@ def session_stop(request: Request, db: Session = Depends(get_db)) -> Envelope:
             except Exception:
                 pass
             try:
-                samples = rec.get_samples()
+                samples = rec.get_series()
             except Exception:
                 samples = []
     finally:
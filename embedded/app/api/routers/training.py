@@ -30,10 +30,12 @@ class VoiceSampleInput(BaseModel):
 @router.post("/training/pose/sample", response_model=Envelope)
 async def training_pose_sample(payload: PoseSampleInput) -> Envelope:
     result = pose_estimator.analyze_frame()
-    joints = [
-        {"name": j.name, "x": j.x, "y": j.y, "score": j.score}
-        for j in result.joints
-    ]
+    # Column layout straight from the pose result; no per-joint dicts just to serialize them
+    joints = {
+        "names": list(result.joints.names),
+        "xy": result.joints.xyzs[:, :2],
+        "score": result.joints.scores,
+    }
     angles = {
         "left_elbow": result.angles.left_elbow,
         "right_elbow": result.angles.right_elbow,
@@ -49,8 +51,9 @@ async def training_pose_sample(payload: PoseSampleInput) -> Envelope:
         "fps": result.fps,
         "notes": payload.notes,
     }
-    path = save_pose_sample(payload.label, joints, angles, metadata)
-    return Envelope(success=True, data={"path": str(path), "quality": result.quality})
+    ref = save_pose_sample(payload.label, joints, angles, metadata)
+    # `path` is the day's shared log (one JSON line per sample); `timestamp_utc` identifies the line
+    return Envelope(success=True, data={"path": str(ref.path), "timestamp_utc": ref.timestamp_utc, "quality": result.quality})
 
 
 @router.post("/training/voice/sample", response_model=Envelope)
@@ -58,9 +61,9 @@ async def training_voice_sample(payload: VoiceSampleInput) -> Envelope:
     intent = payload.intent or map_utterance_to_intent(payload.transcript)
     if not intent:
         raise HTTPException(status_code=400, detail="intent_unknown")
-    path = save_voice_sample(payload.transcript, intent, payload.audio_path)
+    ref = save_voice_sample(payload.transcript, intent, payload.audio_path)
     if payload.add_synonym:
         register_voice_synonym(payload.transcript, intent)
         refresh_commands_cache()
         logger.info("Added synonym '{}' -> {}", payload.transcript, intent)
-    return Envelope(success=True, data={"path": str(path), "intent": intent})
+    return Envelope(success=True, data={"path": str(ref.path), "timestamp_utc": ref.timestamp_utc, "intent": intent})
@@ -58,6 +58,7 @@ class PostureOutput(BaseModel):
     rep_totals: dict[str, int] | None = None
     timestamp_utc: float | None = None
     frame_b64: str | None = None
+    frame_id: int | None = None
 
 
 class BiometricsInput(BaseModel):
@@ -75,12 +75,19 @@ class Settings(BaseModel):
     camera_height: int = int(os.getenv("CAMERA_HEIGHT", "360"))
     camera_fps: int = int(os.getenv("CAMERA_FPS", "15"))
     camera_fourcc: str = os.getenv("CAMERA_FOURCC", "")
+    # Grab the camera on a background thread; frames are decoded only when the pipeline takes one
+    camera_threaded: bool = os.getenv("CAMERA_THREADED", "1").strip().lower() in {"1", "true", "yes", "on"}
     opencv_threads: int = int(os.getenv("OPENCV_THREADS", "1"))
     model_complexity: int = int(os.getenv("MODEL_COMPLEXITY", "0"))
+    # Optional quantized BlazePose landmark model run with tflite-runtime instead of MediaPipe
+    pose_tflite_model_path: str | None = os.getenv("POSE_TFLITE_MODEL_PATH")
+    pose_tflite_delegate: str = os.getenv("POSE_TFLITE_DELEGATE", "")  # e.g. libedgetpu.so.1
     vision_mock: bool = os.getenv("VISION_MOCK", "0").strip().lower() in {"1", "true", "yes", "on"}
     pose_latency_window: int = int(os.getenv("POSE_LATENCY_WINDOW", "90"))
     pose_quality_window: int = int(os.getenv("POSE_QUALITY_WINDOW", "30"))
     pose_frame_skip: int = int(os.getenv("POSE_FRAME_SKIP", "0"))  # process 1 of (skip+1) frames
+    # While counting is off, run the pipeline on 1 of (skip+1) calls and reuse the last result otherwise
+    pose_idle_skip: int = int(os.getenv("POSE_IDLE_SKIP", "5"))
     pose_input_long_side: int = int(os.getenv("POSE_INPUT_LONG_SIDE", "320"))  # resize for inference
     # Rep counting stability (front-facing robustness): hysteresis in degrees and frames to confirm transitions
     pose_rep_hysteresis_deg: float = float(os.getenv("POSE_REP_HYSTERESIS_DEG", "8"))
@@ -95,6 +102,14 @@ class Settings(BaseModel):
     hud_disable: bool = os.getenv("HUD_DISABLE", "0").strip().lower() in {"1", "true", "yes", "on"}
     hud_target_long_side: int = int(os.getenv("HUD_TARGET_LONG_SIDE", "720"))
     hud_jpeg_quality: int = int(os.getenv("HUD_JPEG_QUALITY", "60"))
+    # Inline the HUD JPEG as base64 in /posture; with 0 clients fetch raw bytes from /posture/frame
+    hud_frame_inline: bool = os.getenv("HUD_FRAME_INLINE", "1").strip().lower() in {"1", "true", "yes", "on"}
+    # With the threaded camera, draw + encode the HUD on a worker thread (frames are dropped while busy)
+    hud_async_encode: bool = os.getenv("HUD_ASYNC_ENCODE", "1").strip().lower() in {"1", "true", "yes", "on"}
+    # Max HUD encodes per second (0 = every processed frame)
+    hud_fps_target: float = float(os.getenv("HUD_FPS_TARGET", "0"))
+    # Stop encoding the HUD when no client read a frame for this many seconds (0 = always encode)
+    hud_idle_timeout_s: float = float(os.getenv("HUD_IDLE_TIMEOUT_S", "5"))
 
 
 @lru_cache
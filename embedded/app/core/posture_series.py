@@ -0,0 +1,51 @@
+"""Posture timeline containers shared by SessionRecorder and the metrics exporter.
+
+Kept free of the vision stack so exports can load them without cv2/mediapipe.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+
+@dataclass
+class PostureSample:
+    t: float
+    angle: Optional[float]
+    rep_count: int
+    is_rep: int
+    latency_ms: Optional[float]
+    fps: float
+
+
+@dataclass
+class PostureSeries:
+    """Column-oriented (SoA) posture timeline; missing angles are stored as NaN."""
+
+    t: np.ndarray
+    angle: np.ndarray
+    rep_count: np.ndarray
+    is_rep: np.ndarray
+    latency_ms: np.ndarray
+    fps: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.t.size)
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Any]) -> "PostureSeries":
+        """Build a series from PostureSample objects or their dict form."""
+        def get(s: Any, key: str, default: Any) -> Any:
+            v = s.get(key, default) if isinstance(s, dict) else getattr(s, key, default)
+            return default if v is None else v
+        rows = [s for s in samples if get(s, "t", None) is not None]
+        return cls(
+            t=np.fromiter((float(get(s, "t", 0.0)) for s in rows), dtype=np.float64, count=len(rows)),
+            angle=np.fromiter((float(get(s, "angle", np.nan)) for s in rows), dtype=np.float64, count=len(rows)),
+            rep_count=np.fromiter((int(get(s, "rep_count", 0)) for s in rows), dtype=np.int64, count=len(rows)),
+            is_rep=np.fromiter((int(get(s, "is_rep", 0)) for s in rows), dtype=np.uint8, count=len(rows)),
+            latency_ms=np.fromiter((float(get(s, "latency_ms", np.nan)) for s in rows), dtype=np.float64, count=len(rows)),
+            fps=np.fromiter((float(get(s, "fps", np.nan)) for s in rows), dtype=np.float64, count=len(rows)),
+        )
@@ -1,27 +1,22 @@
 """SessionRecorder: captures posture timeline during a session window.
 
 - Samples PoseEstimator.analyze_frame() at a fixed rate
-- Stores list of samples with t (seconds since start), primary angle, rep_count, is_rep, latency_ms, fps
+- Stores samples column-wise (t, primary angle, rep_count, is_rep, latency_ms, fps) so exports can slice arrays
 - Designed to continue through pauses and stop on session stop
 """
 from __future__ import annotations
 
+import math
 import threading
 import time
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
-
-from app.vision.pipeline import PoseEstimator
+from array import array
+from typing import Any, List, Optional, Tuple
 
+import numpy as np
+from loguru import logger
 
-@dataclass
-class PostureSample:
-    t: float
-    angle: Optional[float]
-    rep_count: int
-    is_rep: int
-    latency_ms: float
-    fps: float
+from app.core.posture_series import PostureSample, PostureSeries
+from app.vision.pipeline import PoseEstimator
 
 
 class SessionRecorder:
@@ -31,50 +26,71 @@ class SessionRecorder:
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
         self._start_ts: Optional[float] = None
-        self._samples: List[PostureSample] = []
         self._last_rep: Optional[int] = None
+        self._clear_columns()
+
+    def _clear_columns(self) -> None:
+        self._t = array("d")
+        self._angle = array("d")
+        self._rep_count = array("q")
+        self._is_rep = array("B")
+        self._latency_ms = array("d")
+        self._fps = array("d")
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
             return
-        self._samples = []
+        self._clear_columns()
         self._last_rep = None
         self._stop.clear()
         self._start_ts = time.perf_counter()
         self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
         self._thread.start()
 
-    def _primary_angle(self, exercise: str, angles: dict) -> Optional[float]:
+    def _primary_angle(self, exercise: str, angles: Any) -> Optional[float]:
+        """Primary angle from a ``PoseAngles`` (slotted: read attributes, there is no ``__dict__``)."""
         def avg(vals: List[float]) -> Optional[float]:
             return sum(vals) / len(vals) if vals else None
         if exercise == "squat":
-            c = [v for v in (angles.get("left_knee"), angles.get("right_knee")) if v is not None]
+            c = [v for v in (getattr(angles, "left_knee", None), getattr(angles, "right_knee", None)) if v is not None]
             return avg([float(x) for x in c]) if c else None
         if exercise == "pushup":
-            c = [v for v in (angles.get("left_elbow"), angles.get("right_elbow")) if v is not None]
+            c = [v for v in (getattr(angles, "left_elbow", None), getattr(angles, "right_elbow", None)) if v is not None]
             return avg([float(x) for x in c]) if c else None
         # crunch
-        hips = [v for v in (angles.get("left_hip"), angles.get("right_hip")) if v is not None]
+        hips = [v for v in (getattr(angles, "left_hip", None), getattr(angles, "right_hip", None)) if v is not None]
         if hips:
             return avg([float(x) for x in hips])
-        sha = angles.get("shoulder_hip_alignment")
+        sha = getattr(angles, "shoulder_hip_alignment", None)
         return float(sha) if sha is not None else None
 
     def _run(self) -> None:
         dt = 1.0 / self.sample_hz
+        failures = 0
         while not self._stop.is_set():
             t0 = time.perf_counter()
             try:
                 res = self.pose_estimator.analyze_frame()
                 exercise = (res.exercise or "").lower()
-                angle = self._primary_angle(exercise, res.angles.__dict__)
+                angle = self._primary_angle(exercise, res.angles)
                 rc = int(res.rep_count or 0)
                 is_rep = 1 if (self._last_rep is not None and rc > self._last_rep) else 0
                 self._last_rep = rc
                 t_rel = (t0 - (self._start_ts or t0))
-                self._samples.append(PostureSample(t=t_rel, angle=angle, rep_count=rc, is_rep=is_rep, latency_ms=float(res.latency_ms), fps=float(res.fps)))
-            except Exception:
-                pass
+                self._t.append(t_rel)
+                self._angle.append(float("nan") if angle is None else angle)
+                self._rep_count.append(rc)
+                self._is_rep.append(is_rep)
+                # Reused idle results carry no latency of their own: NaN keeps them out of latency stats
+                self._latency_ms.append(float("nan") if res.latency_ms is None else float(res.latency_ms))
+                self._fps.append(float(res.fps))
+            except Exception as exc:
+                # Keep sampling, but never drop samples silently: full traceback once, then debug lines
+                failures += 1
+                if failures == 1:
+                    logger.exception("SessionRecorder: fallo al tomar muestra de postura")
+                else:
+                    logger.debug("SessionRecorder: muestra descartada ({} fallos): {}", failures, exc)
             # sleep to maintain ~sample_hz
             t1 = time.perf_counter()
             remain = dt - (t1 - t0)
@@ -86,10 +102,32 @@ class SessionRecorder:
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=timeout)
 
+    def get_series(self) -> PostureSeries:
+        n = len(self._fps)  # last column appended; guards against a sample mid-append
+        return PostureSeries(
+            t=np.array(self._t[:n], dtype=np.float64),
+            angle=np.array(self._angle[:n], dtype=np.float64),
+            rep_count=np.array(self._rep_count[:n], dtype=np.int64),
+            is_rep=np.array(self._is_rep[:n], dtype=np.uint8),
+            latency_ms=np.array(self._latency_ms[:n], dtype=np.float64),
+            fps=np.array(self._fps[:n], dtype=np.float64),
+        )
+
     def get_samples(self) -> List[PostureSample]:
-        return list(self._samples)
+        n = len(self._fps)
+        return [
+            PostureSample(
+                t=self._t[i],
+                angle=None if math.isnan(self._angle[i]) else self._angle[i],
+                rep_count=self._rep_count[i],
+                is_rep=self._is_rep[i],
+                latency_ms=None if math.isnan(self._latency_ms[i]) else self._latency_ms[i],
+                fps=self._fps[i],
+            )
+            for i in range(n)
+        ]
 
     def reset(self) -> None:
-        self._samples = []
+        self._clear_columns()
         self._last_rep = None
         self._start_ts = None
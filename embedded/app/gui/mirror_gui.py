@@ -114,6 +114,7 @@ class OverlayWindow(QtWidgets.QWidget):  # type: ignore
         self.state = HudState({}, {}, {})
         self.last_error: Optional[str] = None
         self.frame_pixmap: Optional["QPixmap"] = None
+        self._frame_id: Optional[int] = None
         self._client = requests.Session() if requests else None
         self._tick = 0
         self._session_interval = HudStyle.ACTIVE_INTERVAL
@@ -323,7 +324,16 @@ class OverlayWindow(QtWidgets.QWidget):  # type: ignore
                     "latency_p50": posture.get("latency_ms_p50"),
                     "latency_p95": posture.get("latency_ms_p95"),
                 }
-                self._update_frame(posture.get("frame_b64"))
+                frame_b64 = posture.get("frame_b64")
+                frame_id = posture.get("frame_id")
+                if frame_b64 or frame_id is None:
+                    self._update_frame(frame_b64)
+                elif frame_id != self._frame_id:
+                    # Server sends frames out of band (HUD_FRAME_INLINE=0): fetch raw JPEG bytes
+                    frame = self._client.get(f"{self.base_url}/posture/frame", timeout=1.2)
+                    if frame.status_code == 200:
+                        self._update_frame_bytes(frame.content)
+                self._frame_id = frame_id
                 self._handle_feedback(posture)
         except Exception as exc:  # pragma: no cover
             self.last_error = f"posture: {exc}"
@@ -332,8 +342,10 @@ class OverlayWindow(QtWidgets.QWidget):  # type: ignore
         if not frame_b64:
             self.frame_pixmap = None
             return
+        self._update_frame_bytes(bytes(QtCore.QByteArray.fromBase64(frame_b64.encode("utf-8"))))
+
+    def _update_frame_bytes(self, data: bytes) -> None:
         try:
-            data = QtCore.QByteArray.fromBase64(frame_b64.encode("utf-8"))
             image = QtGui.QImage.fromData(data, "JPG")
             if not image.isNull():
                 image = image.mirrored(True, False)
@@ -12,22 +12,301 @@ It is designed to be safe and best-effort: failures in one export won't stop oth
 """
 from __future__ import annotations
 
+import csv
+import functools
 import json
+import mmap
+import re
+import sqlite3
 import threading
-from datetime import datetime
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone, tzinfo
 from pathlib import Path
+from statistics import median
 from typing import Optional, Iterable, Any
 
+import numpy as np
+import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 
-# Local imports of scripts (as modules) to reuse logic
-# Note: these imports are runtime-local to avoid import overhead on server start
+from app.core.posture_series import PostureSeries
+
+try:  # Optional fast JSON encoder; stdlib json is used when unavailable
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+# Log-line patterns shared by the voice and performance exporters.
+# Bytes patterns: logs are scanned through mmap and only captured groups are decoded.
+LINE_RE = re.compile(rb"^[^\n]*?(?:Intent '|Text:)[^\n]*", re.M)
+TIME_RE = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d{3,6})?)")
+REC_RE = re.compile(rb"Intent '([a-z]+)' reconocido(?: \(texto='.*'\))?")
+EXEC_RE = re.compile(rb"Intent '([a-z]+)' ejecutado")
+TEXT_RE = re.compile(rb"Text:\s*'([^']+)'")
+
+# Pooled keep-alive client shared by the exporters (they hit the same local API)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_SESSION.headers.update({"Connection": "keep-alive"})
+
+# /debug/metrics responses are reused briefly so concurrent exporters share one round trip
+_METRICS_TTL_S = 5.0
+_metrics_cache: dict[str, tuple[float, dict]] = {}
+_metrics_lock = threading.Lock()
 
 
 def _ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+def _dumps(obj: Any) -> str:
+    """Compact JSON string (used for values embedded in CSV cells)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _write_json(path: Path, obj: Any) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def _p95(values: Any) -> float:
+    """95th percentile via numpy's partition-based selection (no full sort/copy)."""
+    return float(np.percentile(values, 95)) if len(values) else 0.0
+
+
+def _as_series(posture_series: Iterable[Any]) -> PostureSeries:
+    """Accept a PostureSeries (SoA) as-is; convert legacy sample lists once."""
+    if isinstance(posture_series, PostureSeries):
+        return posture_series
+    return PostureSeries.from_samples(posture_series)
+
+
+def _series_vision_metrics(series: PostureSeries) -> tuple[float, float, float]:
+    """Return (fps_avg, latency_p50, latency_p95) aggregated from a posture series."""
+    lats = series.latency_ms[~np.isnan(series.latency_ms)]
+    fps_arr = series.fps[~np.isnan(series.fps)]
+    p50 = float(np.median(lats)) if lats.size else 0.0
+    p95 = _p95(lats)
+    fps = float(fps_arr.mean()) if fps_arr.size else 0.0
+    return fps, p50, p95
+
+
+def _get_json(url: str) -> dict:
+    r = _SESSION.get(url, timeout=3)
+    r.raise_for_status()
+    return r.json() or {}
+
+
+def _debug_metrics(base: str) -> tuple[float, float, float]:
+    """Return (fps_avg, latency_p50, latency_p95) from {base}/debug/metrics, cached per base_url."""
+    with _metrics_lock:
+        hit = _metrics_cache.get(base)
+        if hit is None or time.monotonic() - hit[0] > _METRICS_TTL_S:
+            hit = (time.monotonic(), _get_json(f"{base}/debug/metrics"))
+            _metrics_cache[base] = hit
+    d = hit[1]
+    fps = float(((d.get("fps") or {}).get("avg")) or 0.0)
+    lat = (d.get("latency_ms") or {})
+    return fps, float(lat.get("p50") or 0.0), float(lat.get("p95") or 0.0)
+
+
+# Exporters run concurrently and share the cached connections (guarded by _db_lock)
+_db_lock = threading.Lock()
+# Resolved path -> ((st_ino, st_mtime_ns), connection); oldest entries are closed beyond _RO_CONNS_MAX
+_ro_conns: dict[str, tuple[tuple[int, int], sqlite3.Connection]] = {}
+_RO_CONNS_MAX = 4
+
+
+def _ro_conn(db_path: Path) -> sqlite3.Connection:
+    """Read-only SQLite connection tuned for analytics scans, reused across exports.
+
+    Keyed on the file's inode and mtime: a database replaced or rewritten at the same
+    path (reset, restored backup) gets a fresh connection and the stale one is closed.
+    Call with ``_db_lock`` held.
+    """
+    path = Path(db_path).resolve()
+    st = path.stat()
+    ident = (st.st_ino, st.st_mtime_ns)
+    key = str(path)
+    hit = _ro_conns.pop(key, None)
+    if hit is not None and hit[0] == ident:
+        _ro_conns[key] = hit  # re-insert: most recently used last
+        return hit[1]
+    if hit is not None:
+        hit[1].close()
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    _ro_conns[key] = (ident, conn)
+    while len(_ro_conns) > _RO_CONNS_MAX:
+        _ro_conns.pop(next(iter(_ro_conns)))[1].close()
+    return conn
+
+
+def _query_ro(db_path: Path, sql: str, params: tuple = ()) -> list:
+    with _db_lock:
+        return _ro_conn(db_path).execute(sql, params).fetchall()
+
+
+def _minute_key(dt: datetime) -> int:
+    """Minute bucket as a plain int (avoids a datetime.replace allocation per sample).
+
+    Aware datetimes are bucketed by their UTC minute, so equal instants share a key.
+    """
+    off = dt.utcoffset()
+    if off:
+        dt = dt - off
+    return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
+
+
+def _minute_from_key(k: int, tz: Optional[tzinfo] = None) -> datetime:
+    """Inverse of ``_minute_key``; with ``tz`` the minute is returned as an aware datetime in that zone."""
+    dt = datetime.fromordinal(k // 1440) + timedelta(minutes=k % 1440)
+    if tz is None:
+        return dt
+    return dt.replace(tzinfo=timezone.utc).astimezone(tz)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ts_seconds(ts: str) -> datetime:
+    # Consecutive log lines mostly share the same second: strptime runs once per unique second
+    return datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
+
+
+def _parse_time_prefix(line: bytes) -> Optional[datetime]:
+    m = TIME_RE.match(line)
+    if not m:
+        return None
+    ts = m.group(1).decode("ascii")
+    try:
+        dt = _parse_ts_seconds(ts[:19])
+        if len(ts) > 20:  # ".ffffff" fraction (3-6 digits)
+            dt = dt.replace(microsecond=int(ts[20:].ljust(6, "0")))
+        return dt
+    except Exception:
+        return None
+
+
+def _voice_log_paths(log_path: Path) -> list[Path]:
+    """app.log plus the sibling voice.log written by the external listener; missing or empty files are skipped."""
+    logs_to_parse = []
+    for p in (log_path, log_path.parent / "voice.log"):
+        try:
+            if p.stat().st_size > 0:
+                logs_to_parse.append(p)
+        except Exception:
+            pass
+    return logs_to_parse
+
+
+VoiceStats = tuple[dict[str, int], dict[str, int], dict[str, list[float]]]
+
+
+def _parse_voice_logs(log_paths: Iterable[Path], window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None) -> VoiceStats:
+    """Scan voice logs once and return (recognized, executed, latencies_ms) per intent."""
+    recognized: dict[str, int] = {}
+    executed: dict[str, int] = {}
+    latencies: dict[str, list[float]] = {}
+    last_rec: dict[str, deque[datetime]] = {}
+    try:
+        from app.voice.recognizer import map_utterance_to_intent
+    except Exception:
+        map_utterance_to_intent = None  # type: ignore[assignment]
+
+    for p in log_paths:
+        try:
+            with p.open("rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    # LINE_RE skips lines without voice events at C level
+                    for lm in LINE_RE.finditer(buf):
+                        line = lm.group(0)
+                        t = _parse_time_prefix(line)
+                        if window_start_utc and t and t < window_start_utc:
+                            continue
+                        if window_end_utc and t and t > window_end_utc:
+                            continue
+                        m = REC_RE.search(line) if b"reconocido" in line else None
+                        if m:
+                            it = m.group(1).decode("ascii")
+                            recognized[it] = recognized.get(it, 0) + 1
+                            last_rec.setdefault(it, deque()).append(t or datetime.min)
+                            continue
+                        m = EXEC_RE.search(line) if b"ejecutado" in line else None
+                        if m:
+                            it = m.group(1).decode("ascii")
+                            executed[it] = executed.get(it, 0) + 1
+                            if last_rec.get(it):
+                                tr = last_rec[it].popleft()
+                                if t and tr and tr != datetime.min:
+                                    latencies.setdefault(it, []).append((t - tr).total_seconds() * 1000.0)
+                        # Support external listener prints: Text lines -> map to intents
+                        if b"Text:" in line and b"[VOICE]" in line and map_utterance_to_intent is not None:
+                            try:
+                                mm = TEXT_RE.search(line)
+                                it2 = (map_utterance_to_intent(mm.group(1).decode("utf-8", errors="ignore")) or None) if mm else None
+                                if it2:
+                                    recognized[it2] = recognized.get(it2, 0) + 1
+                                    last_rec.setdefault(it2, deque()).append(t or datetime.min)
+                            except Exception:
+                                pass
+        except Exception:
+            pass
+    return recognized, executed, latencies
+
+
+def _voice_stats_from_session(voice_recognized: list, voice_executed: list, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None) -> VoiceStats:
+    """Pair session-scoped recognized/executed events into the same shape as _parse_voice_logs."""
+    def parse_iso(t: str) -> datetime:
+        try:
+            return datetime.fromisoformat(t)
+        except Exception:
+            return datetime.min
+
+    recognized: dict[str, int] = {}
+    executed: dict[str, int] = {}
+    latencies: dict[str, list[float]] = {}
+    rec_map: dict[str, deque[datetime]] = {}
+    for ev in voice_recognized:
+        it = str(ev.get("intent") or "")
+        tt = parse_iso(str(ev.get("timestamp") or ""))
+        if window_start_utc and tt < window_start_utc:
+            continue
+        if window_end_utc and tt > window_end_utc:
+            continue
+        recognized[it] = recognized.get(it, 0) + 1
+        rec_map.setdefault(it, deque()).append(tt)
+    for ev in voice_executed:
+        it = str(ev.get("intent") or "")
+        tt = parse_iso(str(ev.get("timestamp") or ""))
+        if window_start_utc and tt < window_start_utc:
+            continue
+        if window_end_utc and tt > window_end_utc:
+            continue
+        executed[it] = executed.get(it, 0) + 1
+        if rec_map.get(it):
+            tr = rec_map[it].popleft()
+            if tt and tr and tr != datetime.min:
+                latencies.setdefault(it, []).append((tt - tr).total_seconds() * 1000.0)
+    return recognized, executed, latencies
+
+
+def _collect_voice_stats(log_path: Path, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None, voice_recognized: Optional[list] = None, voice_executed: Optional[list] = None) -> VoiceStats:
+    """Prefer the session arrays; only fall back to scanning app.log/voice.log when they are absent."""
+    if voice_recognized is not None and voice_executed is not None:
+        return _voice_stats_from_session(voice_recognized, voice_executed, window_start_utc, window_end_utc)
+    return _parse_voice_logs(_voice_log_paths(log_path), window_start_utc, window_end_utc)
+
+
 def _timestamp_dir(root: Path) -> Path:
     now = datetime.now()
     sub = now.strftime("%Y%m%d_%H%M%S")
@@ -44,46 +323,27 @@ def export_posture(base_url: str, out_dir: Path, *, duration_min: float = 0.0, p
     """
     try:
         # Always fetch summary first
-        import requests
         base = base_url.rstrip("/")
         # Vision metrics: prefer posture_series values if provided, else /debug/metrics
         fps, p50, p95 = 0.0, 0.0, 0.0
         if posture_series:
             try:
-                lats = []
-                fps_vals = []
-                for s in posture_series:
-                    lat_v = getattr(s, "latency_ms", None) if hasattr(s, "latency_ms") else (s.get("latency_ms") if isinstance(s, dict) else None)
-                    fps_v = getattr(s, "fps", None) if hasattr(s, "fps") else (s.get("fps") if isinstance(s, dict) else None)
-                    if lat_v is not None:
-                        lats.append(float(lat_v))
-                    if fps_v is not None:
-                        fps_vals.append(float(fps_v))
-                if lats:
-                    from statistics import median
-                    p50 = median(lats)
-                    p95 = sorted(lats)[int(0.95 * len(lats)) - 1] if len(lats) > 1 else p50
-                if fps_vals:
-                    fps = sum(fps_vals) / len(fps_vals)
+                fps, p50, p95 = _series_vision_metrics(_as_series(posture_series))
             except Exception as exc:
                 logger.warning("export_posture: fallo al calcular lat/fps desde series: {}", exc)
-        if fps == 0.0 and p50 == 0.0 and p95 == 0.0:
+        # Fire /debug/metrics (only if needed) and /session/status in parallel
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            metrics_f = pool.submit(_debug_metrics, base) if (fps == 0.0 and p50 == 0.0 and p95 == 0.0) else None
+            status_f = pool.submit(_get_json, f"{base}/session/status")
+        if metrics_f is not None:
             try:
-                r = requests.get(f"{base}/debug/metrics", timeout=3)
-                r.raise_for_status()
-                d = r.json() or {}
-                fps = float(((d.get("fps") or {}).get("avg")) or 0.0)
-                lat = (d.get("latency_ms") or {})
-                p50 = float(lat.get("p50") or 0.0)
-                p95 = float(lat.get("p95") or 0.0)
+                fps, p50, p95 = metrics_f.result()
             except Exception as exc:
                 logger.warning("export_posture: no metrics: {}", exc)
         # /session/status
         quality_avg, rep_totals = 0.0, {}
         try:
-            s = requests.get(f"{base}/session/status", timeout=3)
-            s.raise_for_status()
-            sd = (s.json() or {}).get("data") or {}
+            sd = status_f.result().get("data") or {}
             # Prefer windowed session summary (set on stop) to avoid reading reset live totals
             summary = sd.get("session_summary") or {}
             if isinstance(summary, dict):
@@ -99,30 +359,20 @@ def export_posture(base_url: str, out_dir: Path, *, duration_min: float = 0.0, p
         except Exception as exc:
             logger.warning("export_posture: no session status: {}", exc)
         # Write CSV and JSON summary
-        from csv import writer
         csv_path = out_dir / "posture_metrics.csv"
         with csv_path.open("w", newline="", encoding="utf-8") as f:
-            w = writer(f)
+            w = csv.writer(f)
             w.writerow(["fps", "latency_ms_p50", "latency_ms_p95", "rep_totals", "quality_avg"])
-            w.writerow([f"{fps:.2f}", f"{p50:.2f}", f"{p95:.2f}", json.dumps(rep_totals, ensure_ascii=False), f"{quality_avg:.2f}"])
-        with (out_dir / "posture_metrics.json").open("w", encoding="utf-8") as f:
-            json.dump({"fps": fps, "latency_ms_p50": p50, "latency_ms_p95": p95, "rep_totals": rep_totals, "quality_avg": quality_avg}, f, ensure_ascii=False, indent=2)
+            w.writerow([f"{fps:.2f}", f"{p50:.2f}", f"{p95:.2f}", _dumps(rep_totals), f"{quality_avg:.2f}"])
+        _write_json(out_dir / "posture_metrics.json", {"fps": fps, "latency_ms_p50": p50, "latency_ms_p95": p95, "rep_totals": rep_totals, "quality_avg": quality_avg})
         # If series provided (session window), write angulo_tiempo.csv
         if posture_series:
             try:
-                from csv import writer as _writer
-                ang_csv = out_dir / "angulo_tiempo.csv"
-                with ang_csv.open("w", newline="", encoding="utf-8") as f:
-                    w = _writer(f)
-                    w.writerow(["t", "angulo", "is_rep"])
-                    for s in posture_series:
-                        # s can be dataclass PostureSample or dict
-                        t = getattr(s, "t", None) if hasattr(s, "t") else s.get("t")
-                        a = getattr(s, "angle", None) if hasattr(s, "angle") else s.get("angle")
-                        rep = getattr(s, "is_rep", 0) if hasattr(s, "is_rep") else int(s.get("is_rep", 0))
-                        if t is None:
-                            continue
-                        w.writerow([f"{float(t):.3f}", ("" if a is None else f"{float(a):.3f}"), int(rep)])
+                series = _as_series(posture_series)
+                angle_col = np.char.mod("%.3f", series.angle)
+                angle_col[np.isnan(series.angle)] = ""
+                rows = np.column_stack([np.char.mod("%.3f", series.t), angle_col, series.is_rep.astype(str)])
+                np.savetxt(out_dir / "angulo_tiempo.csv", rows, fmt="%s", delimiter=",", header="t,angulo,is_rep", comments="", encoding="utf-8")
             except Exception as exc:
                 logger.warning("No se pudo escribir angulo_tiempo.csv: {}", exc)
     except Exception as exc:
@@ -132,49 +382,43 @@ def export_posture(base_url: str, out_dir: Path, *, duration_min: float = 0.0, p
 def export_biometrics(db_path: Path, out_dir: Path, *, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None) -> None:
     """Inline export to avoid cross-package imports in production."""
     try:
-        import sqlite3
-        from collections import defaultdict
-        from statistics import median
-        import csv as _csv
-
         # Load samples
-        conn = sqlite3.connect(str(db_path))
-        try:
-            cur = conn.cursor()
-            if window_start_utc and window_end_utc:
-                cur.execute(
-                    "SELECT timestamp_utc, heart_rate_bpm, COALESCE(zone_label,'') FROM biometric_sample WHERE timestamp_utc BETWEEN ? AND ? ORDER BY timestamp_utc ASC",
-                    (window_start_utc.replace(tzinfo=None), window_end_utc.replace(tzinfo=None)),
-                )
-            else:
-                cur.execute(
-                    "SELECT timestamp_utc, heart_rate_bpm, COALESCE(zone_label,'') FROM biometric_sample ORDER BY timestamp_utc ASC"
-                )
-            samples = []
-            from datetime import datetime as _dt
-            for ts, hr, zl in cur.fetchall():
-                try:
-                    if isinstance(ts, str):
-                        dt = _dt.fromisoformat(ts)
-                    else:
-                        dt = _dt.utcfromtimestamp(float(ts))
-                    samples.append((dt, int(hr or 0), str(zl or "")))
-                except Exception:
-                    continue
-        finally:
-            conn.close()
+        if window_start_utc and window_end_utc:
+            rows = _query_ro(
+                db_path,
+                "SELECT timestamp_utc, heart_rate_bpm, COALESCE(zone_label,'') FROM biometric_sample WHERE timestamp_utc BETWEEN ? AND ? ORDER BY timestamp_utc ASC",
+                (window_start_utc.replace(tzinfo=None), window_end_utc.replace(tzinfo=None)),
+            )
+        else:
+            rows = _query_ro(
+                db_path,
+                "SELECT timestamp_utc, heart_rate_bpm, COALESCE(zone_label,'') FROM biometric_sample ORDER BY timestamp_utc ASC",
+            )
+        samples = []
+        for ts, hr, zl in rows:
+            try:
+                if isinstance(ts, str):
+                    dt = datetime.fromisoformat(ts)
+                else:
+                    dt = datetime.utcfromtimestamp(float(ts))
+                samples.append((dt, int(hr or 0), str(zl or "")))
+            except Exception:
+                continue
 
         # Export intraday minute buckets
-        buckets = {}
+        buckets: dict[int, tuple[int, str]] = {}
+        # Offset of the first sample in each minute, kept so t_min prints with it (e.g. "+00:00")
+        bucket_tz: dict[int, Optional[tzinfo]] = {}
         for dt, hr, zl in samples:
-            minute = dt.replace(second=0, microsecond=0)
-            buckets[minute] = (hr, zl)
+            k = _minute_key(dt)
+            buckets[k] = (hr, zl)
+            bucket_tz.setdefault(k, dt.tzinfo)
         with (out_dir / "fitbit_intraday.csv").open("w", newline="", encoding="utf-8") as f:
-            w = _csv.writer(f)
+            w = csv.writer(f)
             w.writerow(["t_min", "hr", "zone_label"])
             for k in sorted(buckets.keys()):
                 hr, zl = buckets[k]
-                w.writerow([k.isoformat(), hr, zl])
+                w.writerow([_minute_from_key(k, bucket_tz[k]).isoformat(), hr, zl])
 
         # Metrics
         if len(samples) < 2:
@@ -187,14 +431,13 @@ def export_biometrics(db_path: Path, out_dir: Path, *, window_start_utc: Optiona
             avg_latency = sum(gaps) / len(gaps)
             freshness = float(median(gaps))
             # Intraday coverage
-            from datetime import datetime as _ldt
-            now = _ldt.now()
+            now = datetime.now()
             day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             minutes_total = max(1, int((now - day_start).total_seconds() // 60))
             minute_marks = set()
             for dt, _, _ in samples:
                 if dt >= day_start:
-                    minute_marks.add(dt.replace(second=0, microsecond=0))
+                    minute_marks.add(_minute_key(dt))
             coverage = 100.0 * len(minute_marks) / float(minutes_total)
             metrics = {
                 "freshness_s": round(freshness, 3),
@@ -202,126 +445,15 @@ def export_biometrics(db_path: Path, out_dir: Path, *, window_start_utc: Optiona
                 "avg_update_latency_s": round(avg_latency, 3),
             }
 
-        with (out_dir / "biometrics_summary.json").open("w", encoding="utf-8") as f:
-            json.dump(metrics, f, ensure_ascii=False, indent=2)
+        _write_json(out_dir / "biometrics_summary.json", metrics)
     except Exception as exc:
         logger.warning("export_biometrics fallo: {}", exc)
 
 
-def export_voice(log_path: Path, out_dir: Path, *, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None, voice_recognized: Optional[list] = None, voice_executed: Optional[list] = None) -> None:
+def export_voice(log_path: Path, out_dir: Path, *, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None, voice_recognized: Optional[list] = None, voice_executed: Optional[list] = None, voice_stats: Optional[VoiceStats] = None) -> None:
     try:
-        import re
-        import csv as _csv
-        from statistics import median
-        from datetime import datetime as _dt
-
-        TIME_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d{3,6})?)")
-        REC_RE = re.compile(r"Intent '([a-z]+)' reconocido(?: \(texto='.*'\))?")
-        EXEC_RE = re.compile(r"Intent '([a-z]+)' ejecutado")
-
-        def parse_time_prefix(line: str):
-            m = TIME_RE.match(line)
-            if not m:
-                return None
-            ts = m.group(1)
-            for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
-                try:
-                    return _dt.strptime(ts, fmt)
-                except Exception:
-                    continue
-            return None
-
-        recognized = {}
-        executed = {}
-        last_rec = {}
-        latencies = {}
-
-        if voice_recognized is not None and voice_executed is not None:
-            # Compute accuracy/latency from session-scoped arrays
-            def parse_iso(t: str) -> _dt:
-                try:
-                    return _dt.fromisoformat(t)
-                except Exception:
-                    return _dt.min
-            # Build queues
-            rec_map = {}
-            for ev in voice_recognized:
-                it = str(ev.get("intent") or "")
-                tt = parse_iso(str(ev.get("timestamp") or ""))
-                if window_start_utc and tt < window_start_utc:
-                    continue
-                if window_end_utc and tt > window_end_utc:
-                    continue
-                recognized[it] = recognized.get(it, 0) + 1
-                rec_map.setdefault(it, []).append(tt)
-            for ev in voice_executed:
-                it = str(ev.get("intent") or "")
-                tt = parse_iso(str(ev.get("timestamp") or ""))
-                if window_start_utc and tt < window_start_utc:
-                    continue
-                if window_end_utc and tt > window_end_utc:
-                    continue
-                executed[it] = executed.get(it, 0) + 1
-                if rec_map.get(it):
-                    tr = rec_map[it].pop(0)
-                    if tt and tr and tr != _dt.min:
-                        latencies.setdefault(it, []).append((tt - tr).total_seconds() * 1000.0)
-        else:
-            # Fallback: parse logs and filter by window. Try both app.log and voice.log
-            logs_to_parse = [log_path]
-            try:
-                alt = log_path.parent / "voice.log"
-                if alt.exists():
-                    logs_to_parse.append(alt)
-            except Exception:
-                pass
-
-            def _parse_file(p: Path) -> None:
-                try:
-                    with p.open("r", encoding="utf-8", errors="ignore") as f:
-                        for line in f:
-                            t = parse_time_prefix(line)
-                            if window_start_utc and t and t < window_start_utc:
-                                continue
-                            if window_end_utc and t and t > window_end_utc:
-                                continue
-                            m = REC_RE.search(line)
-                            if m:
-                                it = m.group(1)
-                                recognized[it] = recognized.get(it, 0) + 1
-                                last_rec.setdefault(it, []).append(t or _dt.min)
-                                continue
-                            m = EXEC_RE.search(line)
-                            if m:
-                                it = m.group(1)
-                                executed[it] = executed.get(it, 0) + 1
-                                if last_rec.get(it):
-                                    tr = last_rec[it].pop(0)
-                                    if t and tr and tr != _dt.min:
-                                        lat = (t - tr).total_seconds() * 1000.0
-                                        latencies.setdefault(it, []).append(lat)
-                            # Support external listener prints: Text lines -> map to intents
-                            if "Text:" in line and "[VOICE]" in line:
-                                try:
-                                    import re as __re
-                                    mm = __re.search(r"Text:\s*'([^']+)'", line)
-                                    if mm:
-                                        txt = mm.group(1)
-                                        try:
-                                            from app.voice.recognizer import map_utterance_to_intent as __map
-                                            it2 = __map(txt) or None
-                                        except Exception:
-                                            it2 = None
-                                        if it2:
-                                            recognized[it2] = recognized.get(it2, 0) + 1
-                                            last_rec.setdefault(it2, []).append(t or _dt.min)
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
-
-            for p in logs_to_parse:
-                _parse_file(p)
+        # Session arrays when provided; else parse logs filtered by window (or reuse the shared result)
+        recognized, executed, latencies = voice_stats or _collect_voice_stats(log_path, window_start_utc, window_end_utc, voice_recognized, voice_executed)
 
         intents = sorted(set(list(recognized.keys()) + list(executed.keys())))
         acc = {}
@@ -335,179 +467,62 @@ def export_voice(log_path: Path, out_dir: Path, *, window_start_utc: Optional[da
 
         # Write CSV
         with (out_dir / "voice_accuracy.csv").open("w", newline="", encoding="utf-8") as f:
-            w = _csv.writer(f)
+            w = csv.writer(f)
             w.writerow(["intent", "accuracy_pct", "latency_ms"])
             for it in intents:
                 w.writerow([it, f"{acc.get(it, 0.0):.2f}", f"{meds.get(it, 0.0):.0f}"])
 
         summary = {"per_intent": {it: {"accuracy_pct": round(acc.get(it, 0.0), 2), "latency_ms": round(meds.get(it, 0.0), 0)} for it in intents}}
-        with (out_dir / "voice_summary.json").open("w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        _write_json(out_dir / "voice_summary.json", summary)
     except Exception as exc:
         logger.warning("export_voice fallo: {}", exc)
 
 
-def export_performance(base_url: str, db_path: Path, log_path: Path, out_dir: Path, *, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None, posture_series: Optional[Iterable[Any]] = None, voice_recognized: Optional[list] = None, voice_executed: Optional[list] = None) -> None:
+def export_performance(base_url: str, db_path: Path, log_path: Path, out_dir: Path, *, window_start_utc: Optional[datetime] = None, window_end_utc: Optional[datetime] = None, posture_series: Optional[Iterable[Any]] = None, voice_recognized: Optional[list] = None, voice_executed: Optional[list] = None, voice_stats: Optional[VoiceStats] = None) -> None:
     try:
-        import requests
-        import sqlite3
-        from statistics import median
-        import re
-        from datetime import datetime as _dt
-        from csv import writer as _writer
-
         # Vision (/debug/metrics)
         v_fps, v_p50, v_p95 = 0.0, 0.0, 0.0
         # If posture_series present, compute vision latency and fps from it
         if posture_series:
-            lats = []
-            fps_vals = []
-            for s in posture_series:
-                lat_v = getattr(s, "latency_ms", None) if hasattr(s, "latency_ms") else s.get("latency_ms")
-                fps_v = getattr(s, "fps", None) if hasattr(s, "fps") else s.get("fps")
-                if lat_v is not None:
-                    lats.append(float(lat_v))
-                if fps_v is not None:
-                    fps_vals.append(float(fps_v))
-            v_p50 = median(lats) if lats else 0.0
-            v_p95 = sorted(lats)[int(0.95 * len(lats)) - 1] if lats else 0.0
-            v_fps = (sum(fps_vals) / len(fps_vals)) if fps_vals else 0.0
+            v_fps, v_p50, v_p95 = _series_vision_metrics(_as_series(posture_series))
         else:
             try:
-                r = requests.get(f"{base_url.rstrip('/')}/debug/metrics", timeout=3)
-                r.raise_for_status()
-                d = r.json() or {}
-                v_fps = float(((d.get("fps") or {}).get("avg")) or 0.0)
-                lat = (d.get("latency_ms") or {})
-                v_p50 = float(lat.get("p50") or 0.0)
-                v_p95 = float(lat.get("p95") or 0.0)
+                v_fps, v_p50, v_p95 = _debug_metrics(base_url.rstrip("/"))
             except Exception:
                 pass
 
         # Biometrics (gaps from SQLite)
-        conn = sqlite3.connect(str(db_path))
+        if window_start_utc and window_end_utc:
+            rows = _query_ro(db_path, "SELECT timestamp_utc FROM biometric_sample WHERE timestamp_utc BETWEEN ? AND ? ORDER BY timestamp_utc ASC",
+                             (window_start_utc.replace(tzinfo=None), window_end_utc.replace(tzinfo=None)))
+        else:
+            rows = _query_ro(db_path, "SELECT timestamp_utc FROM biometric_sample ORDER BY timestamp_utc ASC")
         ts = []
-        try:
-            cur = conn.cursor()
-            if window_start_utc and window_end_utc:
-                cur.execute("SELECT timestamp_utc FROM biometric_sample WHERE timestamp_utc BETWEEN ? AND ? ORDER BY timestamp_utc ASC",
-                            (window_start_utc.replace(tzinfo=None), window_end_utc.replace(tzinfo=None)))
-            else:
-                cur.execute("SELECT timestamp_utc FROM biometric_sample ORDER BY timestamp_utc ASC")
-            for (t,) in cur.fetchall():
-                try:
-                    if isinstance(t, str):
-                        ts.append(_dt.fromisoformat(t))
-                    else:
-                        ts.append(_dt.utcfromtimestamp(float(t)))
-                except Exception:
-                    continue
-        finally:
-            conn.close()
+        for (t,) in rows:
+            try:
+                if isinstance(t, str):
+                    ts.append(datetime.fromisoformat(t))
+                else:
+                    ts.append(datetime.utcfromtimestamp(float(t)))
+            except Exception:
+                continue
         b_gaps = []
         for i in range(1, len(ts)):
             b_gaps.append((ts[i] - ts[i - 1]).total_seconds() * 1000.0)
         b_p50 = median(b_gaps) if b_gaps else 0.0
-        b_p95 = sorted(b_gaps)[int(0.95 * len(b_gaps)) - 1] if b_gaps else 0.0
+        b_p95 = _p95(b_gaps)
         b_fps = (1000.0 / (sum(b_gaps) / len(b_gaps))) if b_gaps else 0.0
 
         # Voice latencies: prefer session arrays if provided; else fallback to log parsing
-        lats = []
-        if voice_recognized is not None and voice_executed is not None:
-            from datetime import datetime as __dt
-            def _parse_iso(ts: str) -> __dt:
-                try:
-                    return __dt.fromisoformat(ts)
-                except Exception:
-                    return __dt.min
-            rec_map: dict[str, list[__dt]] = {}
-            for ev in voice_recognized:
-                it = str(ev.get("intent") or "")
-                tt = _parse_iso(str(ev.get("timestamp") or ""))
-                if window_start_utc and tt < window_start_utc:
-                    continue
-                if window_end_utc and tt > window_end_utc:
-                    continue
-                rec_map.setdefault(it, []).append(tt)
-            for ev in voice_executed:
-                it = str(ev.get("intent") or "")
-                tt = _parse_iso(str(ev.get("timestamp") or ""))
-                if window_start_utc and tt < window_start_utc:
-                    continue
-                if window_end_utc and tt > window_end_utc:
-                    continue
-                if rec_map.get(it):
-                    tr = rec_map[it].pop(0)
-                    if tt and tr and tr != __dt.min:
-                        lats.append((tt - tr).total_seconds() * 1000.0)
-        else:
-            TIME_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d{3,6})?)")
-            REC_RE = re.compile(r"Intent '([a-z]+)' reconocido(?: \(texto='.*'\))?")
-            EXEC_RE = re.compile(r"Intent '([a-z]+)' ejecutado")
-            def parse_time_prefix(line: str):
-                m = TIME_RE.match(line)
-                if not m:
-                    return None
-                ts = m.group(1)
-                for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
-                    try:
-                        return _dt.strptime(ts, fmt)
-                    except Exception:
-                        continue
-                return None
-            last_rec = {}
-            def _parse_file(p: Path) -> None:
-                try:
-                    with p.open("r", encoding="utf-8", errors="ignore") as f:
-                        for line in f:
-                            t = parse_time_prefix(line)
-                            m = REC_RE.search(line)
-                            if m:
-                                it = m.group(1)
-                                last_rec.setdefault(it, []).append(t or _dt.min)
-                                continue
-                            m = EXEC_RE.search(line)
-                            if m:
-                                it = m.group(1)
-                                if last_rec.get(it):
-                                    tr = last_rec[it].pop(0)
-                                    if t and tr and tr != _dt.min:
-                                        lats.append((t - tr).total_seconds() * 1000.0)
-                            # Support external listener prints
-                            if "Text:" in line and "[VOICE]" in line:
-                                try:
-                                    import re as __re
-                                    mm = __re.search(r"Text:\s*'([^']+)'", line)
-                                    if mm:
-                                        txt = mm.group(1)
-                                        try:
-                                            from app.voice.recognizer import map_utterance_to_intent as __map
-                                            it2 = __map(txt) or None
-                                        except Exception:
-                                            it2 = None
-                                        if it2:
-                                            last_rec.setdefault(it2, []).append(t or _dt.min)
-                                except Exception:
-                                    pass
-                except Exception:
-                    pass
-            # Parse both app.log and voice.log if present
-            logs_to_parse = [log_path]
-            try:
-                alt = log_path.parent / "voice.log"
-                if alt.exists():
-                    logs_to_parse.append(alt)
-            except Exception:
-                pass
-            for p in logs_to_parse:
-                _parse_file(p)
+        _, _, per_intent = voice_stats or _collect_voice_stats(log_path, window_start_utc, window_end_utc, voice_recognized, voice_executed)
+        lats = [v for vals in per_intent.values() for v in vals]
         voice_p50 = median(lats) if lats else 0.0
-        voice_p95 = sorted(lats)[int(0.95 * len(lats)) - 1] if lats else 0.0
+        voice_p95 = _p95(lats)
 
         hud_fps = v_fps
 
         with (out_dir / "comparativo_desempeno.csv").open("w", newline="", encoding="utf-8") as f:
-            w = _writer(f)
+            w = csv.writer(f)
             w.writerow(["modulo", "fps", "lat_p50", "lat_p95"])
             w.writerow(["Vision", f"{v_fps:.2f}", f"{v_p50:.0f}", f"{v_p95:.0f}"])
             w.writerow(["Biometrics", f"{b_fps:.3f}", f"{b_p50:.0f}", f"{b_p95:.0f}"])
@@ -522,8 +537,7 @@ def export_performance(base_url: str, db_path: Path, log_path: Path, out_dir: Pa
             "p95_total": round(sum(p95_vals) / len(p95_vals), 2) if p95_vals else 0.0,
             "fps_total": round(sum(fps_vals) / len(fps_vals), 2) if fps_vals else 0.0,
         }
-        with (out_dir / "performance_summary.json").open("w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        _write_json(out_dir / "performance_summary.json", summary)
     except Exception as exc:
         logger.warning("export_performance fallo: {}", exc)
 
@@ -541,10 +555,24 @@ def generate_all_exports(*, base_url: str = "http://127.0.0.1:8000", db_path: Op
     out_dir = _timestamp_dir(out_root)
 
     logger.info("Exportando métricas a {}", out_dir)
-    export_posture(base_url, out_dir, duration_min=sample_posture_minutes, posture_series=posture_series)
-    export_biometrics(db, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc)
-    export_voice(logs, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc, voice_recognized=voice_recognized, voice_executed=voice_executed)
-    export_performance(base_url, db, logs, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc, posture_series=posture_series, voice_recognized=voice_recognized, voice_executed=voice_executed)
+    if posture_series:
+        posture_series = _as_series(posture_series)
+    # Voice events are paired once and shared; logs are only scanned without session arrays.
+    # On failure each exporter recomputes (and guards) its own stats, so one bad event can't stop the rest.
+    voice_stats: Optional[VoiceStats] = None
+    try:
+        voice_stats = _collect_voice_stats(logs, window_start_utc, window_end_utc, voice_recognized, voice_executed)
+    except Exception as exc:
+        logger.warning("metrics_exporter: no se pudieron precalcular stats de voz: {}", exc)
+    # Exporters are I/O-bound and independent (each catches its own errors): run them concurrently
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="MetricsExport") as pool:
+        futures = [
+            pool.submit(export_posture, base_url, out_dir, duration_min=sample_posture_minutes, posture_series=posture_series),
+            pool.submit(export_biometrics, db, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc),
+            pool.submit(export_voice, logs, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc, voice_recognized=voice_recognized, voice_executed=voice_executed, voice_stats=voice_stats),
+            pool.submit(export_performance, base_url, db, logs, out_dir, window_start_utc=window_start_utc, window_end_utc=window_end_utc, posture_series=posture_series, voice_recognized=voice_recognized, voice_executed=voice_executed, voice_stats=voice_stats),
+        ]
+        wait(futures)
 
     logger.info("Exportación completada: {}", out_dir)
     return out_dir
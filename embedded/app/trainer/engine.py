@@ -11,32 +11,37 @@ from loguru import logger
 
 from app.api.schemas import RoutineOutput
 
+_BASE_BLOCKS = (
+    {"type": "warmup", "name": "Jumping Jacks", "reps": 30},
+    {"type": "strength", "name": "Push Ups", "reps": 12},
+    {"type": "core", "name": "Plank", "secs": 45},
+    {"type": "cooldown", "name": "Stretch", "secs": 60},
+)
+
+
+def _scale_reps(blocks: tuple, factor: float, floor: int = 0) -> tuple:
+    return tuple({**b, "reps": max(floor, int(b["reps"] * factor))} if "reps" in b else dict(b) for b in blocks)
+
+
+# Intensity variants are fixed, so they are computed once at import (templates; copied per routine)
+_BLOCKS_MID, _DUR_MID = _BASE_BLOCKS, 15
+_BLOCKS_HIGH, _DUR_HIGH = _scale_reps(_BASE_BLOCKS, 0.8, floor=8), 12  # hr > 130: reduce intensity
+_BLOCKS_LOW, _DUR_LOW = _scale_reps(_BASE_BLOCKS, 1.2), 18  # hr < 90: increase intensity
+
 
 class TrainerEngine:
     """Produces and adapts training routines."""
 
     def generate_routine(self, user_id: str, performance: Optional[dict]) -> RoutineOutput:
         """Return a basic routine, adjusting intensity if performance given."""
-        base_blocks = [
-            {"type": "warmup", "name": "Jumping Jacks", "reps": 30},
-            {"type": "strength", "name": "Push Ups", "reps": 12},
-            {"type": "core", "name": "Plank", "secs": 45},
-            {"type": "cooldown", "name": "Stretch", "secs": 60},
-        ]
-        duration = 15
+        blocks, duration = _BLOCKS_MID, _DUR_MID
         if performance:
             hr = performance.get("heart_rate_bpm", 0)
             if hr > 130:
-                # reduce intensity
-                for b in base_blocks:
-                    if "reps" in b:
-                        b["reps"] = max(8, int(b["reps"] * 0.8))
-                duration = 12
+                blocks, duration = _BLOCKS_HIGH, _DUR_HIGH
             elif hr < 90:
-                for b in base_blocks:
-                    if "reps" in b:
-                        b["reps"] = int(b["reps"] * 1.2)
-                duration = 18
-        rid = str(uuid.uuid4())
+                blocks, duration = _BLOCKS_LOW, _DUR_LOW
+        rid = uuid.uuid4().hex
         logger.info("generated routine {} for user {}", rid, user_id)
-        return RoutineOutput(routine_id=rid, blocks=base_blocks, duration_min=duration)
+        # Fresh dicts per routine: callers may edit blocks, the module-level variants must stay intact
+        return RoutineOutput(routine_id=rid, blocks=[dict(b) for b in blocks], duration_min=duration)
@@ -1,81 +1,546 @@
 from __future__ import annotations
 
+import atexit
 import json
-from datetime import datetime, timezone
+import os
+import queue
+import threading
+import time
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 
-from loguru import logger
+import numpy as np
 
-BASE_DIR = Path(__file__).resolve().parent.parent / "data" / "training"
+try:  # Optional fast JSON encoder; falls back to stdlib json
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+__all__ = [
+    "canonicalize_utterance",
+    "SampleRef",
+    "VoiceCommandIndex",
+    "flush_training_writes",
+    "get_voice_command_index",
+    "joints_from_soa",
+    "joints_to_soa",
+    "load_voice_commands",
+    "register_voice_synonym",
+    "register_voice_synonyms",
+    "save_pose_sample",
+    "save_voice_commands",
+    "save_voice_sample",
+]
+
+# __file__ is already absolute for imported modules (Python >= 3.9); no realpath walk needed
+DATA_DIR = Path(__file__).parent.parent / "data"
+BASE_DIR = DATA_DIR / "training"
 POSE_DIR = BASE_DIR / "pose"
 VOICE_DIR = BASE_DIR / "voice"
-COMMANDS_FILE = Path(__file__).resolve().parent.parent / "data" / "voice_commands.json"
+COMMANDS_FILE = DATA_DIR / "voice_commands.json"
+
+# Parsed voice_commands.json keyed by (path, st_mtime_ns); re-read only when the file changes
+_COMMANDS_CACHE: Optional[Tuple[Tuple[str, int], Dict[str, str]]] = None
+_COMMANDS_LOCK = threading.Lock()
+
+# Samples are appended to one JSONL file per day; TRAINING_LEGACY_FILES=1 keeps one JSON file per sample
+_LEGACY_FILES = os.getenv("TRAINING_LEGACY_FILES", "0") == "1"
+# Legacy sample files are compact unless TRAINING_PRETTY=1 (voice_commands.json is always indented)
+_PRETTY = os.getenv("TRAINING_PRETTY", "0") == "1"
+_FLUSH_EVERY = 32
+_FLUSH_INTERVAL_S = 1.0
+
+# Serialized samples are handed to a single background writer, in order; a full queue blocks the caller
+_WRITE_QUEUE: "queue.Queue[Optional[Tuple[Any, Path, bytes]]]" = queue.Queue(maxsize=256)
+_WRITE_THREAD: Optional[threading.Thread] = None
+_WRITE_THREAD_LOCK = threading.Lock()
+# Set at interpreter exit once the writer is drained; later samples are written inline
+_WRITES_CLOSED = False
+_WRITE_BATCH = 32
+
+_ENSURED_DIRS: set[Path] = set()
+_ENSURED_DIRS_LOCK = threading.Lock()
+
+
+@cache
+def _logger() -> Any:
+    # loguru is imported on first use so importing this module for its constants stays cheap
+    from loguru import logger
+
+    return logger
 
 
 def _ensure_dir(path: Path) -> None:
+    # One mkdir per directory per process; a racing duplicate mkdir is harmless (exist_ok)
+    if path in _ENSURED_DIRS:
+        return
     path.mkdir(parents=True, exist_ok=True)
+    with _ENSURED_DIRS_LOCK:
+        _ENSURED_DIRS.add(path)
 
 
-def _timestamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+@lru_cache(maxsize=256)
+def _slug(value: str) -> str:
+    return value.lower().replace(" ", "_")
 
 
-def save_pose_sample(label: str, joints: List[Dict[str, Any]], angles: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> Path:
-    """Persist a labeled pose sample for future training."""
-    _ensure_dir(POSE_DIR)
-    slug = label.lower().replace(" ", "_")
-    fname = f"{_timestamp()}_{slug}.json"
-    path = POSE_DIR / fname
-    payload = {
-        "label": label,
-        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-        "joints": joints,
-        "angles": angles,
-        "metadata": metadata or {},
+def canonicalize_utterance(value: str) -> str:
+    """Lower-case an utterance and collapse runs of whitespace to single spaces."""
+    return " ".join(value.lower().split())
+
+
+def _json_default(obj: Any) -> Any:
+    # stdlib fallback for numpy arrays/scalars (orjson serializes them natively)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes (numpy scalars/arrays handled by orjson)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize to one compact JSON line terminated by a newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default) + "\n").encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _utc_now() -> Tuple[time.struct_time, int]:
+    """Current UTC time as (struct_time, microseconds) from one time_ns() read; no datetime involved."""
+    ns = time.time_ns()
+    return time.gmtime(ns // 1_000_000_000), (ns // 1000) % 1_000_000
+
+
+def _format_ts(t: time.struct_time, us: int) -> str:
+    return f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}T{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}{us:06d}Z"
+
+
+def _format_iso(t: time.struct_time, us: int) -> str:
+    # Same shape as datetime.isoformat() for an aware UTC datetime (microseconds always present)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{us:06d}+00:00"
+
+
+JointsInput = Union[Sequence[Mapping[str, Any]], Mapping[str, Any]]
+
+
+class SampleRef(NamedTuple):
+    """Where a saved sample lives: the file it is written to plus its own ``timestamp_utc``.
+
+    With the daily JSONL logs ``path`` is shared by every sample of that day, so the
+    timestamp (microsecond resolution) is what identifies the line.
+    Writes are queued: call ``flush_training_writes`` before reading ``path`` back.
+    """
+
+    path: Path
+    timestamp_utc: str
+
+
+# Normalized coordinates leave [0, 1] for off-frame joints (ankles below the frame, y ~ 1.2), so int16
+# covers [-4, 4] at ~1.2e-4 resolution. The scale is stored per sample; older scale-32767 data still reads.
+_Q16_SCALE = 8191
+_Q16_RANGE = 32767 / _Q16_SCALE
+
+
+def joints_to_soa(joints: JointsInput) -> Dict[str, Any]:
+    """Convert per-joint dicts (name/x/y/score) to the quantized ``soa_q16`` column layout.
+
+    Mappings already in column form (``names``/``xy``/``score``) are accepted too.
+    Values are stored as int16 multiples of ``1 / scale``; only values beyond +/-4 saturate.
+    """
+    if isinstance(joints, Mapping):
+        names = list(joints.get("names", ()))
+        xy = np.asarray(joints.get("xy", ()), dtype=np.float32).reshape(-1, 2)
+        score = np.asarray(joints.get("score", ()), dtype=np.float32)
+    else:
+        n = len(joints)
+        names = [j["name"] for j in joints]
+        xy = np.empty((n, 2), dtype=np.float32)
+        score = np.empty(n, dtype=np.float32)
+        for i, j in enumerate(joints):
+            xy[i, 0] = j["x"]
+            xy[i, 1] = j["y"]
+            score[i] = j.get("score", 0.0)
+    return {
+        "format": "soa_q16",
+        "scale": _Q16_SCALE,
+        "names": names,
+        "xy": _quantize(xy),
+        "score": _quantize(score),
     }
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    logger.info("Saved pose training sample to {}", path)
-    return path
 
 
-def save_voice_sample(transcript: str, intent: str, audio_path: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Path:
-    """Persist a voice sample descriptor for training datasets."""
+def _quantize(values: np.ndarray) -> np.ndarray:
+    return np.rint(np.clip(values, -_Q16_RANGE, _Q16_RANGE) * _Q16_SCALE).astype(np.int16)
+
+
+def joints_from_soa(joints: Mapping[str, Any] | Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Expand a stored joints block back into per-joint dicts.
+
+    Handles ``soa_q16`` (int16 columns), ``soa_v1`` (float columns) and the
+    original list of per-joint dicts, which is returned as-is.
+    """
+    if not isinstance(joints, Mapping):
+        return [dict(j) for j in joints]
+    scale = float(joints.get("scale", 1))
+    xy = np.asarray(joints.get("xy", ()), dtype=np.float64).reshape(-1, 2) / scale
+    score = np.asarray(joints.get("score", ()), dtype=np.float64) / scale
+    return [
+        {"name": name, "x": float(p[0]), "y": float(p[1]), "score": float(c)}
+        for name, p, c in zip(joints.get("names", []), xy, score)
+    ]
+
+
+@lru_cache(maxsize=16)
+def _log_path(directory: Path, year: int, month: int, day: int) -> Path:
+    # One Path per directory per day instead of a strftime + Path join per sample
+    return directory / f"{year:04d}{month:02d}{day:02d}.jsonl"
+
+
+class _JsonlWriter:
+    """Keeps the current day's JSONL file open and appends buffered lines to it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._path: Optional[Path] = None
+        self._fh = None
+        self._pending = 0
+        self._last_flush = 0.0
+
+    @staticmethod
+    def path_for(directory: Path, t: time.struct_time) -> Path:
+        return _log_path(directory, t.tm_year, t.tm_mon, t.tm_mday)
+
+    def append(self, path: Path, line: bytes) -> None:
+        with self._lock:
+            if path != self._path:
+                # Day rolled over (or the target directory changed): switch files
+                self._close()
+                self._fh = open(path, "ab")
+                self._path = path
+            self._fh.write(line)
+            self._pending += 1
+            mono = time.monotonic()
+            if self._pending >= _FLUSH_EVERY or mono - self._last_flush >= _FLUSH_INTERVAL_S:
+                self._fh.flush()
+                self._pending = 0
+                self._last_flush = mono
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._fh is not None and self._pending:
+                self._fh.flush()
+                self._pending = 0
+                self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._path = None
+        self._pending = 0
+
+
+_POSE_WRITER = _JsonlWriter()
+_VOICE_WRITER = _JsonlWriter()
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    path.write_bytes(data)
+
+
+def _write_batch(items: List[Tuple[Any, Path, bytes]]) -> None:
+    # Consecutive lines for the same log are joined so a burst costs one write() per file
+    i = 0
+    while i < len(items):
+        fn, path, data = items[i]
+        j = i + 1
+        if fn is not _write_file:
+            while j < len(items) and items[j][0] is fn and items[j][1] == path:
+                j += 1
+            if j - i > 1:
+                data = b"".join(item[2] for item in items[i:j])
+        try:
+            fn(path, data)
+        except Exception as exc:
+            _logger().warning("Failed to write training sample {}: {}", path, exc)
+        i = j
+
+
+def _write_loop() -> None:
+    while True:
+        batch: List[Tuple[Any, Path, bytes]] = []
+        stop = False
+        item = _WRITE_QUEUE.get()
+        while True:
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+            if len(batch) >= _WRITE_BATCH:
+                break
+            try:
+                item = _WRITE_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            _write_batch(batch)
+            if _WRITE_QUEUE.empty():
+                # End of a burst: push the tail out of the userspace buffer so readers (and a
+                # hard power-off) don't wait on a later append that may never come
+                _flush_logs()
+        finally:
+            for _ in range(len(batch) + stop):
+                _WRITE_QUEUE.task_done()
+        if stop:
+            return
+
+
+def _submit_write(fn: Any, path: Path, data: bytes) -> None:
+    global _WRITE_THREAD
+    # Enqueued under the lock so a concurrent flush can't put its stop sentinel ahead of this item
+    with _WRITE_THREAD_LOCK:
+        if _WRITES_CLOSED:
+            # Shutting down and the writer is gone: write inline rather than lose the sample
+            _write_batch([(fn, path, data)])
+            _close_logs()
+            return
+        if _WRITE_THREAD is None:
+            _WRITE_THREAD = threading.Thread(target=_write_loop, name="training-writer", daemon=True)
+            _WRITE_THREAD.start()
+        # Backpressure: a full queue blocks until the writer catches up; writing from here instead
+        # would put this line ahead of the ones still queued
+        _WRITE_QUEUE.put((fn, path, data))
+
+
+def _stop_writer(close: bool) -> None:
+    global _WRITE_THREAD, _WRITES_CLOSED
+    with _WRITE_THREAD_LOCK:
+        if _WRITE_THREAD is not None:
+            _WRITE_QUEUE.put(None)
+            _WRITE_THREAD.join()
+            _WRITE_THREAD = None
+        if close:
+            _WRITES_CLOSED = True
+    _close_logs()
+
+
+def _flush_logs() -> None:
+    for writer in (_POSE_WRITER, _VOICE_WRITER):
+        try:
+            writer.flush()
+        except Exception as exc:
+            _logger().warning("Failed to flush training log: {}", exc)
+
+
+def _close_logs() -> None:
+    _POSE_WRITER.close()
+    _VOICE_WRITER.close()
+
+
+def flush_training_writes() -> None:
+    """Drain pending writes, stop the writer thread and close the sample logs.
+
+    Everything is restarted lazily by the next save.
+    """
+    _stop_writer(close=False)
+
+
+@atexit.register
+def _shutdown_training_writes() -> None:
+    # Unlike flush_training_writes, no writer is restarted afterwards: late saves write inline
+    _stop_writer(close=True)
+
+
+_TLS = threading.local()
+_EMPTY_META: Dict[str, Any] = {}  # shared stand-in for metadata=None; never mutated
+
+
+def _payload_buf() -> Dict[str, Any]:
+    """Per-thread payload dict reused across saves (serializers don't keep references)."""
+    buf = getattr(_TLS, "payload", None)
+    if buf is None:
+        buf = _TLS.payload = {}
+    return buf
+
+
+def save_pose_sample(label: str, joints: JointsInput, angles: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> SampleRef:
+    """Persist a labeled pose sample for future training and return its ``SampleRef``.
+
+    Joints are stored column-wise (see ``joints_to_soa``); read them back with ``joints_from_soa``.
+    """
+    _ensure_dir(POSE_DIR)
+    t, us = _utc_now()  # one clock read for both the filename and the payload
+    payload = _payload_buf()
+    payload["label"] = label
+    payload["timestamp_utc"] = stamp = _format_iso(t, us)
+    payload["joints"] = joints_to_soa(joints)
+    payload["angles"] = angles
+    payload["metadata"] = metadata or _EMPTY_META
+    data = _dumps(payload) if _LEGACY_FILES and _PRETTY else _dumps_line(payload)
+    payload.clear()  # don't keep the caller's objects alive until the next sample
+    if _LEGACY_FILES:
+        path = POSE_DIR / f"{_format_ts(t, us)}_{_slug(label)}.json"
+        _submit_write(_write_file, path, data)
+    else:
+        path = _JsonlWriter.path_for(POSE_DIR, t)
+        _submit_write(_POSE_WRITER.append, path, data)
+    _logger().info("Queued pose training sample {} for {}", stamp, path)
+    return SampleRef(path, stamp)
+
+
+def save_voice_sample(transcript: str, intent: str, audio_path: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> SampleRef:
+    """Persist a voice sample descriptor for training datasets and return its ``SampleRef``."""
     _ensure_dir(VOICE_DIR)
-    slug = intent.lower().replace(" ", "_")
-    fname = f"{_timestamp()}_{slug}.json"
-    path = VOICE_DIR / fname
-    payload = {
-        "transcript": transcript.strip(),
-        "intent": intent,
-        "audio_path": audio_path,
-        "metadata": metadata or {},
-        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-    }
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    logger.info("Saved voice training sample to {}", path)
-    return path
+    t, us = _utc_now()
+    payload = _payload_buf()
+    payload["transcript"] = transcript.strip()
+    payload["intent"] = intent
+    payload["audio_path"] = audio_path
+    payload["metadata"] = metadata or _EMPTY_META
+    payload["timestamp_utc"] = stamp = _format_iso(t, us)
+    data = _dumps(payload) if _LEGACY_FILES and _PRETTY else _dumps_line(payload)
+    payload.clear()
+    if _LEGACY_FILES:
+        path = VOICE_DIR / f"{_format_ts(t, us)}_{_slug(intent)}.json"
+        _submit_write(_write_file, path, data)
+    else:
+        path = _JsonlWriter.path_for(VOICE_DIR, t)
+        _submit_write(_VOICE_WRITER.append, path, data)
+    _logger().info("Queued voice training sample {} for {}", stamp, path)
+    return SampleRef(path, stamp)
 
 
-def load_voice_commands() -> Dict[str, str]:
-    if COMMANDS_FILE.exists():
+def _cached_voice_commands() -> Tuple[Optional[Tuple[str, int]], Dict[str, str]]:
+    """Return (cache key, shared mapping); the mapping must not be mutated by callers."""
+    global _COMMANDS_CACHE
+    with _COMMANDS_LOCK:
+        try:
+            key = (str(COMMANDS_FILE), COMMANDS_FILE.stat().st_mtime_ns)
+        except OSError:
+            return None, {}
+        if _COMMANDS_CACHE is not None and _COMMANDS_CACHE[0] == key:
+            return _COMMANDS_CACHE
         try:
-            return json.loads(COMMANDS_FILE.read_text(encoding="utf-8"))
+            mapping = _loads(COMMANDS_FILE.read_bytes())
         except Exception:
-            logger.warning("Failed to read voice commands dataset {}", COMMANDS_FILE)
-            return {}
-    return {}
+            _logger().warning("Failed to read voice commands dataset {}", COMMANDS_FILE)
+            return None, {}
+        _COMMANDS_CACHE = (key, mapping)
+        return _COMMANDS_CACHE
+
+
+def load_voice_commands() -> Dict[str, str]:
+    return dict(_cached_voice_commands()[1])
+
+
+class VoiceCommandIndex:
+    """Character trie over canonical utterance keys.
+
+    ``get`` is an exact lookup; ``best_match`` returns the intent of the longest
+    key contained in the utterance, so the cost depends on the utterance length
+    rather than on the number of registered synonyms.
+    """
+
+    __slots__ = ("_mapping", "_root")
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        self._mapping = dict(mapping)
+        root: Dict[Optional[str], Any] = {}
+        for key, intent in self._mapping.items():
+            if not key:
+                continue
+            node = root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[None] = intent  # None never collides with a one-character edge
+        self._root = root
+
+    def __len__(self) -> int:
+        return len(self._mapping)
+
+    def get(self, utterance: str) -> Optional[str]:
+        return self._mapping.get(utterance)
+
+    def best_match(self, utterance: str) -> Optional[str]:
+        intent = self._mapping.get(utterance)
+        if intent is not None:
+            return intent
+        best, best_len = None, 0
+        root, n = self._root, len(utterance)
+        for i in range(n):
+            node = root.get(utterance[i])
+            j = i + 1
+            while node is not None:
+                if None in node and j - i > best_len:
+                    best, best_len = node[None], j - i
+                if j == n:
+                    break
+                node = node.get(utterance[j])
+                j += 1
+        return best
+
+
+# Keyed by the identity of the cached mapping, which is replaced whenever the file is re-read or saved
+_INDEX_CACHE: Optional[Tuple[Dict[str, str], VoiceCommandIndex]] = None
+
+
+def get_voice_command_index() -> VoiceCommandIndex:
+    """Index over voice_commands.json, rebuilt only when the file changes."""
+    global _INDEX_CACHE
+    mapping = _cached_voice_commands()[1]
+    cached = _INDEX_CACHE
+    if cached is not None and cached[0] is mapping:
+        return cached[1]
+    index = VoiceCommandIndex(mapping)
+    _INDEX_CACHE = (mapping, index)
+    return index
 
 
 def save_voice_commands(mapping: Dict[str, str]) -> None:
+    global _COMMANDS_CACHE
     _ensure_dir(COMMANDS_FILE.parent)
-    COMMANDS_FILE.write_text(json.dumps(mapping, indent=2, ensure_ascii=False), encoding="utf-8")
-    logger.info("Updated voice commands dataset {}", COMMANDS_FILE)
+    with _COMMANDS_LOCK:
+        # Write a sibling temp file and rename it into place: readers never see a torn file
+        tmp = COMMANDS_FILE.with_suffix(COMMANDS_FILE.suffix + ".tmp")
+        tmp.write_bytes(_dumps(mapping))
+        os.replace(tmp, COMMANDS_FILE)
+        _COMMANDS_CACHE = ((str(COMMANDS_FILE), COMMANDS_FILE.stat().st_mtime_ns), dict(mapping))
+    _logger().info("Updated voice commands dataset {}", COMMANDS_FILE)
 
 
 def register_voice_synonym(utterance: str, intent: str) -> None:
     """Persist a new utterance->intent mapping."""
-    utterance = utterance.strip().lower()
+    register_voice_synonyms([(utterance, intent)])
+
+
+def register_voice_synonyms(pairs: Iterable[Tuple[str, str]]) -> int:
+    """Persist several utterance->intent mappings with a single load and write.
+
+    Returns the number of entries that changed; the file is not rewritten when nothing did.
+    """
     mapping = load_voice_commands()
-    mapping[utterance] = intent
-    save_voice_commands(mapping)
+    changed = 0
+    for utterance, intent in pairs:
+        key = canonicalize_utterance(utterance)
+        if mapping.get(key) != intent:
+            mapping[key] = intent
+            changed += 1
+    if changed:
+        save_voice_commands(mapping)
+    return changed
@@ -1,5 +1,5 @@
 """Vision package exports."""
 
-from .pipeline import PoseAngles, PoseEstimator, PoseJoint, PoseResult
+from .pipeline import PoseAngles, PoseEstimator, PoseJoint, PoseJointsSoA, PoseResult
 
-__all__ = ["PoseEstimator", "PoseResult", "PoseJoint", "PoseAngles"]
+__all__ = ["PoseEstimator", "PoseResult", "PoseJoint", "PoseJointsSoA", "PoseAngles"]
@@ -0,0 +1,136 @@
+"""Numeric kernels for the pose pipeline, JIT-compiled with numba when it is installed.
+
+``compute_all`` is ``None`` without numba; callers then use the NumPy batch in
+``PoseEstimator._compute_angles``. ``_compute_all`` is the plain-Python source of
+the kernel (kept importable for tests).
+
+``part_levels`` is always callable: the compiled kernel with numba, its plain-Python
+source ``_part_levels`` otherwise.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+try:  # Optional JIT; not needed for correctness
+    from numba import njit  # type: ignore
+except Exception:  # pragma: no cover
+    njit = None  # type: ignore
+
+# fastmath without 'nnan'/'ninf': missing joints are encoded as NaN and must propagate
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _compute_all(points: np.ndarray, triplets: np.ndarray, out: np.ndarray) -> None:
+    """Fill ``out`` with one angle per triplet plus the torso lean as the last entry.
+
+    points: (J, 3) float32 joint coordinates (NaN rows for missing joints).
+    triplets: (T, 3) uint8 joint indices (a, b, c); the angle is measured at b.
+    The last triplet must be (left_shoulder, left_hip, right_hip) for the torso lean.
+    out: (T + 1,) float32; NaN where a joint is missing.
+    """
+    n = triplets.shape[0]
+    for t in range(n):
+        a = triplets[t, 0]
+        b = triplets[t, 1]
+        c = triplets[t, 2]
+        v1x = points[a, 0] - points[b, 0]
+        v1y = points[a, 1] - points[b, 1]
+        v1z = points[a, 2] - points[b, 2]
+        v2x = points[c, 0] - points[b, 0]
+        v2y = points[c, 1] - points[b, 1]
+        v2z = points[c, 2] - points[b, 2]
+        norm = math.sqrt(v1x * v1x + v1y * v1y + v1z * v1z) * math.sqrt(v2x * v2x + v2y * v2y + v2z * v2z)
+        if norm != norm:
+            out[t] = np.nan
+        elif norm == 0.0:
+            out[t] = 0.0
+        else:
+            cos = (v1x * v2x + v1y * v2y + v1z * v2z) / norm
+            cos = min(1.0, max(-1.0, cos))
+            out[t] = math.degrees(math.acos(cos))
+    s = triplets[n - 1, 0]
+    lh = triplets[n - 1, 1]
+    rh = triplets[n - 1, 2]
+    vx = points[s, 0] - (points[lh, 0] + points[rh, 0]) / 2.0
+    vy = points[s, 1] - (points[lh, 1] + points[rh, 1]) / 2.0
+    if vx != vx or vy != vy:
+        out[n] = np.nan
+    else:
+        out[n] = math.degrees(math.atan2(abs(vx), abs(vy) + 1e-6))
+
+
+compute_all = njit(cache=True, fastmath=_FASTMATH, boundscheck=False)(_compute_all) if njit is not None else None
+
+
+def _level(err: float, margin: float) -> int:
+    if err <= margin:
+        return 0
+    if err <= 2.0 * margin:
+        return 1
+    return 2
+
+
+if njit is not None:
+    # Compiled so the part_levels kernel can call it in nopython mode
+    _level = njit(cache=True, inline="always")(_level)
+
+
+def part_margin(down: float, up: float) -> float:
+    """Tolerance (degrees) of one level step; range-based so it scales with the exercise."""
+    return max(5.0, max(10.0, abs(up - down)) * 0.10)
+
+
+def _part_levels(
+    exercise_id: int,
+    target: float,
+    margin: float,
+    left_knee: float,
+    right_knee: float,
+    left_elbow: float,
+    right_elbow: float,
+    torso_forward: float,
+    shoulder_hip_alignment: float,
+) -> tuple:
+    """Status level per part (0 green, 1 yellow, 2 red) as (left_arm, right_arm, left_leg, right_leg, torso).
+
+    exercise_id: 0 squat, 1 pushup, 2 crunch, anything else keeps every part green.
+    target is the current phase's angle and margin comes from ``part_margin``.
+    Angles are degrees, NaN when missing.
+    """
+    # Legs: only relevant for squat; individual knees vs current target
+    left_leg = right_leg = 0.0
+    if exercise_id == 0:
+        if left_knee == left_knee:
+            left_leg = abs(left_knee - target)
+        if right_knee == right_knee:
+            right_leg = abs(right_knee - target)
+    # Arms: push-up primary is elbow; green for the other exercises
+    left_arm = right_arm = 0.0
+    if exercise_id == 1:
+        if left_elbow == left_elbow:
+            left_arm = abs(left_elbow - target)
+        if right_elbow == right_elbow:
+            right_arm = abs(right_elbow - target)
+    # Torso: excessive lean (squat), missing flexion (crunch) or sagging (pushup, small lean is worse)
+    tf = torso_forward if torso_forward == torso_forward else 0.0
+    torso = 0.0
+    if exercise_id == 0:
+        torso = max(0.0, tf - 25.0)
+    elif exercise_id == 2:
+        if shoulder_hip_alignment == shoulder_hip_alignment:
+            torso = abs(shoulder_hip_alignment - target)
+    elif exercise_id == 1:
+        torso = max(0.0, 10.0 - tf)
+    return (
+        _level(left_arm, margin),
+        _level(right_arm, margin),
+        _level(left_leg, margin),
+        _level(right_leg, margin),
+        _level(torso, margin),
+    )
+
+
+# NaN self-comparisons mark missing angles, so the same NaN-safe fastmath flags apply
+part_levels = njit(cache=True, fastmath=_FASTMATH)(_part_levels) if njit is not None else _part_levels
@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 import math
+import threading
 import time
 from collections import deque
 import base64
-from dataclasses import dataclass, asdict, field
-from statistics import median
-from typing import Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from operator import attrgetter
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 from loguru import logger
@@ -22,10 +26,363 @@ try:  # Optional when running in CI
 except Exception:  # pragma: no cover
     mp = None  # type: ignore
 
+try:  # Optional int8 TFLite backend (tflite-runtime wheel on the Raspberry Pi)
+    from tflite_runtime.interpreter import Interpreter as TFLiteInterpreter, load_delegate  # type: ignore
+except Exception:  # pragma: no cover
+    TFLiteInterpreter = None  # type: ignore
+    load_delegate = None  # type: ignore
+
 from app.core.config import get_settings
+from app.vision._angles_jit import compute_all as _jit_compute_all, part_levels as _part_levels, part_margin
+
+
+# Joint triplets (a, b, c) whose angle at b fills the matching PoseAngles field
+_ANGLE_TRIPLETS: Tuple[Tuple[str, str, str], ...] = (
+    ("left_shoulder", "left_elbow", "left_wrist"),
+    ("right_shoulder", "right_elbow", "right_wrist"),
+    ("left_hip", "left_knee", "left_ankle"),
+    ("right_hip", "right_knee", "right_ankle"),
+    ("left_shoulder", "left_hip", "left_knee"),
+    ("right_shoulder", "right_hip", "right_knee"),
+    ("left_shoulder", "left_hip", "right_hip"),  # also used for torso_forward
+)
+_ANGLE_FIELDS: Tuple[str, ...] = (
+    "left_elbow",
+    "right_elbow",
+    "left_knee",
+    "right_knee",
+    "left_hip",
+    "right_hip",
+    "shoulder_hip_alignment",
+)
+_ANGLE_JOINTS: Tuple[str, ...] = tuple(name for triplet in _ANGLE_TRIPLETS for name in triplet)
+_MISSING_POINT = (math.nan, math.nan, math.nan)
+# Index form of the triplets for the JIT kernel: joints are numbered by first appearance
+_KERNEL_JOINTS: Tuple[str, ...] = tuple(dict.fromkeys(_ANGLE_JOINTS))
+_TRIPLET_IDX = np.array(
+    [[_KERNEL_JOINTS.index(name) for name in triplet] for triplet in _ANGLE_TRIPLETS], dtype=np.uint8
+)
+
+# BlazePose landmark indices (same numbering as mp.solutions.pose.PoseLandmark)
+_POSE_LANDMARK_INDEX: Dict[str, int] = {
+    "left_shoulder": 11,
+    "right_shoulder": 12,
+    "left_elbow": 13,
+    "right_elbow": 14,
+    "left_wrist": 15,
+    "right_wrist": 16,
+    "left_hip": 23,
+    "right_hip": 24,
+    "left_knee": 25,
+    "right_knee": 26,
+    "left_ankle": 27,
+    "right_ankle": 28,
+    "nose": 0,
+}
+_BLAZEPOSE_LANDMARKS = 33
+# Row order of the per-frame key-joint array: landmark ids to gather, and the rows each consumer reads
+_KEY_NAMES: Tuple[str, ...] = tuple(_POSE_LANDMARK_INDEX)
+_KEY_IDS = np.array([_POSE_LANDMARK_INDEX[name] for name in _KEY_NAMES], dtype=np.int32)
+_ANGLE_ROWS = np.array([_KEY_NAMES.index(name) for name in _ANGLE_JOINTS], dtype=np.int32)
+_KERNEL_ROWS = np.array([_KEY_NAMES.index(name) for name in _KERNEL_JOINTS], dtype=np.int32)
+# Max per-coordinate landmark change (normalized units) still treated as "body unchanged"
+_STATIC_EPS = 1e-3
+# Streaming HUD JPEGs: baseline, no Huffman optimisation pass, 4:2:0 chroma (pinned explicitly)
+_HUD_JPEG_FLAGS: Tuple[int, ...] = (
+    (
+        int(cv2.IMWRITE_JPEG_OPTIMIZE), 0,
+        int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0,
+        int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420),
+    )
+    if cv2 is not None and hasattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR")
+    else ()
+)
+# Pixel stride of the frame sample used to recognise an unchanged HUD image
+_HUD_FINGERPRINT_STRIDE = 32
+
+
+# Feedback messages are fixed strings; build them once instead of formatting per frame
+_NO_SKELETON_FEEDBACK = ("no_skeleton", "No se detecta el cuerpo")
+_FEEDBACK_PART_PRIORITY: Dict[str, Tuple[str, ...]] = {
+    "squat": ("torso", "left_leg", "right_leg"),
+    "pushup": ("left_arm", "right_arm", "torso"),
+    "crunch": ("torso", "left_leg", "right_leg"),  # torso refleja flexión del tronco
+}
+
+
+def _build_part_feedback() -> Dict[Tuple[str, str, int], Tuple[str, str]]:
+    """(exercise, worst part, sign) -> (code, message); sign +1 means the angle is above target."""
+    table: Dict[Tuple[str, str, int], Tuple[str, str]] = {}
+    for sign in (-1, 1):
+        table[("squat", "torso", sign)] = ("straight_back", "Mantén la espalda recta")
+        table[("pushup", "torso", sign)] = ("brace_core", "Activa el core; evita arquear el torso")
+    for key, side in (("left_leg", "izquierda"), ("right_leg", "derecha")):
+        table[("squat", key, 1)] = ("go_lower_" + side, f"Baja más con la rodilla {side}")
+        table[("squat", key, -1)] = ("extend_" + side, f"Extiende más la rodilla {side}")
+    for key, side in (("left_arm", "izquierdo"), ("right_arm", "derecho")):
+        table[("pushup", key, 1)] = ("go_lower_" + side, f"Flexiona más el codo {side}")
+        table[("pushup", key, -1)] = ("extend_" + side, f"Extiende más el codo {side}")
+    table[("crunch", "torso", -1)] = ("protect_neck", "No cargues el cuello")
+    table[("crunch", "torso", 1)] = ("go_higher", "Activa el abdomen y sube")
+    return table
+
+
+_PART_FEEDBACK = _build_part_feedback()
+# exercise -> (angle near/above "up", angle near/below "down")
+_GENERIC_FEEDBACK: Dict[str, Tuple[Tuple[str, str], Tuple[str, str]]] = {
+    "squat": (("go_lower", "Baja más la cadera"), ("control_up", "Controla el ascenso")),
+    "pushup": (("go_lower", "Flexiona más los codos"), ("control_up", "Sube con control")),
+}
+_QUALITY_FEEDBACK = (
+    ("excellent", "Excelente técnica"),
+    ("good", "Buen ritmo"),
+    ("keep_trying", "Sigue así, estabiliza el movimiento"),
+)
+_IDLE_FEEDBACK = ("idle", "Listo para empezar")
+
+# exercise -> (getter of the two primary angles, combine with min instead of mean, fallback field);
+# unknown exercises use the crunch row
+_PRIMARY_ANGLE_SPEC: Dict[str, Tuple[attrgetter, bool, Optional[str]]] = {
+    "squat": (attrgetter("left_knee", "right_knee"), False, None),
+    # Front-facing pushups: the arm that bends more (min) is robust to partial occlusions
+    "pushup": (attrgetter("left_elbow", "right_elbow"), True, None),
+    # Front-facing crunch: hip angles, falling back to the shoulder-hip alignment
+    "crunch": (attrgetter("left_hip", "right_hip"), False, "shoulder_hip_alignment"),
+}
+
+# HUD skeleton: (joint a, joint b, body part used for the line colour)
+_SKELETON_CONNECTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("left_ankle", "left_knee", "left_leg"),
+    ("left_knee", "left_hip", "left_leg"),
+    ("left_hip", "left_shoulder", "torso"),
+    ("left_shoulder", "left_elbow", "left_arm"),
+    ("left_elbow", "left_wrist", "left_arm"),
+    ("right_ankle", "right_knee", "right_leg"),
+    ("right_knee", "right_hip", "right_leg"),
+    ("right_hip", "right_shoulder", "torso"),
+    ("right_shoulder", "right_elbow", "right_arm"),
+    ("right_elbow", "right_wrist", "right_arm"),
+    ("left_shoulder", "right_shoulder", "torso"),
+    ("left_hip", "right_hip", "torso"),
+)
+
+
+# Body part whose colour a joint dot takes; joints not listed (e.g. nose) use the torso colour
+_JOINT_PART: Dict[str, str] = {
+    f"{side}_{joint}": f"{side}_{part}"
+    for side in ("left", "right")
+    for part, names in (("leg", ("hip", "knee", "ankle")), ("arm", ("shoulder", "elbow", "wrist")))
+    for joint in names
+}
+
+
+@lru_cache(maxsize=8)
+def _skeleton_layout(names: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray, Tuple[str, ...], Tuple[str, ...]]:
+    """Connection endpoint rows (idx_a, idx_b) with their parts, and per-row joint parts, for one
+    joint naming (there are only a few)."""
+    rows = {name: i for i, name in enumerate(names)}
+    lines = [(rows[a], rows[b], part) for a, b, part in _SKELETON_CONNECTIONS if a in rows and b in rows]
+    idx_a = np.array([line[0] for line in lines], dtype=np.intp)
+    idx_b = np.array([line[1] for line in lines], dtype=np.intp)
+    return idx_a, idx_b, tuple(line[2] for line in lines), tuple(_JOINT_PART.get(name, "torso") for name in names)
+
+
+def _rotate_joints(joints: PoseJointsSoA, angle: int) -> PoseJointsSoA:
+    """Map normalized joint coordinates onto a frame rotated clockwise by ``angle`` (multiple of 90)."""
+    if angle not in (90, 180, 270) or not len(joints):
+        return joints
+    x, y = joints.xyzs[:, 0], joints.xyzs[:, 1]
+    xyzs = joints.xyzs.copy()
+    if angle == 90:
+        xyzs[:, 0], xyzs[:, 1] = 1.0 - y, x
+    elif angle == 180:
+        xyzs[:, 0], xyzs[:, 1] = 1.0 - x, 1.0 - y
+    else:
+        xyzs[:, 0], xyzs[:, 1] = y, 1.0 - x
+    return PoseJointsSoA(joints.names, xyzs, joints.scores)
+
+
+def _joint_pixels(joints: PoseJointsSoA, width: int, height: int) -> np.ndarray:
+    """(N, 2) int32 pixel coordinates of the joints on a ``width`` x ``height`` image (truncated)."""
+    return (joints.xyzs[:, :2] * (width, height)).astype(np.int32)
+
+
+def _q1(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+_PART_KEYS = ("left_arm", "right_arm", "left_leg", "right_leg", "torso")
+_LEVEL_NAMES = ("green", "yellow", "red")
+_LEVEL_BGR: Dict[str, Tuple[int, int, int]] = {"green": (0, 200, 0), "yellow": (0, 215, 255), "red": (0, 0, 255)}
+_PART_EXERCISE_ID = {"squat": 0, "pushup": 1, "crunch": 2}
+
+
+@lru_cache(maxsize=256)
+def _part_colors_for(
+    exercise: str,
+    target: float,
+    margin: float,
+    left_knee: Optional[float],
+    right_knee: Optional[float],
+    left_elbow: Optional[float],
+    right_elbow: Optional[float],
+    torso_forward: Optional[float],
+    shoulder_hip_alignment: Optional[float],
+) -> Dict[str, str]:
+    """Per-part colour levels for one (exercise, target, margin, angles) input; shared, do not mutate."""
+    nan = math.nan
+    levels = _part_levels(
+        _PART_EXERCISE_ID.get(exercise, -1),
+        target,
+        margin,
+        nan if left_knee is None else left_knee,
+        nan if right_knee is None else right_knee,
+        nan if left_elbow is None else left_elbow,
+        nan if right_elbow is None else right_elbow,
+        nan if torso_forward is None else torso_forward,
+        nan if shoulder_hip_alignment is None else shoulder_hip_alignment,
+    )
+    return {key: _LEVEL_NAMES[level] for key, level in zip(_PART_KEYS, levels)}
+
+
+class P2Quantile:
+    """Streaming quantile estimate (Jain & Chlamtac P² algorithm).
+
+    O(1) work and five markers per sample instead of sorting the whole series on
+    every query. Until five samples arrive the exact interpolated quantile is returned.
+    """
+
+    __slots__ = ("p", "_q", "_n", "_np", "_dn")
+
+    def __init__(self, p: float) -> None:
+        self.p = p
+        self._q: List[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float) -> None:
+        q = self._q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        n, np_ = self._n, self._np
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            np_[i] += self._dn[i]
+        for i in (1, 2, 3):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                # Piecewise-parabolic prediction, falling back to linear when it leaves the bracket
+                qp = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = qp
+                n[i] += step
+
+    def value(self) -> float:
+        q = self._q
+        if not q:
+            return 0.0
+        if self._n[4] == 4:  # five samples or fewer: exact quantile of what we have
+            pos = self.p * (len(q) - 1)
+            lo = int(pos)
+            hi = min(lo + 1, len(q) - 1)
+            return q[lo] + (q[hi] - q[lo]) * (pos - lo)
+        return q[2]
+
+
+class WindowedQuantile:
+    """P² quantile over roughly the last ``window`` samples.
+
+    Two estimators run half a window apart; queries read the older one, which is retired
+    once it has seen ``window`` samples, so the estimate always covers the most recent
+    window/2 to window samples and an early slow stretch ages out.
+    """
+
+    __slots__ = ("p", "_half", "_old", "_new", "_count")
+
+    def __init__(self, p: float, window: int) -> None:
+        self.p = p
+        self._half = max(1, int(window) // 2)
+        self._old = P2Quantile(p)
+        self._new = P2Quantile(p)
+        self._count = 0
+
+    def add(self, x: float) -> None:
+        self._old.add(x)
+        self._new.add(x)
+        self._count += 1
+        if self._count >= self._half:
+            self._old, self._new = self._new, P2Quantile(self.p)
+            self._count = 0
+
+    def value(self) -> float:
+        return self._old.value()
+
+
+class RollingMean:
+    """Mean of the last ``size`` values from a fixed ring buffer and a running sum (O(1) per sample).
+
+    The sum is recomputed from the buffer each time the head wraps, so float drift cannot build up.
+    """
+
+    __slots__ = ("_buf", "_head", "_len", "_sum")
+
+    def __init__(self, size: int) -> None:
+        self._buf = [0.0] * max(1, size)
+        self._head = 0
+        self._len = 0
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def size(self) -> int:
+        return len(self._buf)
+
+    def push(self, value: float) -> float:
+        """Add ``value`` and return the updated mean."""
+        buf, head = self._buf, self._head
+        if self._len == len(buf):
+            self._sum -= buf[head]
+        else:
+            self._len += 1
+        buf[head] = value
+        self._sum += value
+        head += 1
+        if head == len(buf):
+            head = 0
+            self._sum = sum(buf)
+        self._head = head
+        return self._sum / self._len
+
+    def mean(self) -> float:
+        return self._sum / self._len if self._len else 0.0
+
+    def clear(self) -> None:
+        self._head = self._len = 0
+        self._sum = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class PoseJoint:
     name: str
     x: float
@@ -34,7 +391,37 @@ class PoseJoint:
     score: float
 
 
-@dataclass
+@dataclass(slots=True)
+class PoseJointsSoA:
+    """Joints as columns: ``xyzs`` is (N, 3) and ``scores`` is (N,), row i belongs to ``names[i]``.
+
+    Per-joint dicts/objects are only built when serializing (``to_list``) or iterating.
+    """
+
+    names: Tuple[str, ...]
+    xyzs: np.ndarray
+    scores: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        for name, (x, y, z), score in zip(self.names, self.xyzs.tolist(), self.scores.tolist()):
+            yield PoseJoint(name, x, y, z, score)
+
+    def to_list(self) -> List[dict]:
+        return [
+            {"name": name, "x": x, "y": y, "z": z, "score": score}
+            for name, (x, y, z), score in zip(self.names, self.xyzs.tolist(), self.scores.tolist())
+        ]
+
+    @classmethod
+    def from_rows(cls, rows: Tuple[Tuple[str, float, float, float, float], ...]) -> "PoseJointsSoA":
+        arr = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 4)
+        return cls(tuple(row[0] for row in rows), arr[:, :3], arr[:, 3])
+
+
+@dataclass(slots=True)
 class PoseAngles:
     left_elbow: Optional[float] = None
     right_elbow: Optional[float] = None
@@ -46,13 +433,13 @@ class PoseAngles:
     torso_forward: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PoseResult:
     fps: float
-    latency_ms: float
+    latency_ms: Optional[float]  # None on results reused by the idle skip (no frame was processed)
     latency_ms_p50: float
     latency_ms_p95: float
-    joints: List[PoseJoint]
+    joints: PoseJointsSoA
     angles: PoseAngles
     quality: float
     quality_avg: float
@@ -66,18 +453,239 @@ class PoseResult:
     rep_totals: Dict[str, int] = field(default_factory=dict)
     timestamp_utc: float = field(default_factory=lambda: time.time())
     frame_b64: Optional[str] = None
+    frame_id: Optional[int] = None
 
     def to_dict(self) -> dict:
-        result = asdict(self)
-        result["joints"] = [asdict(j) for j in self.joints]
-        result["angles"] = asdict(self.angles)
-        return result
+        # Built by hand: asdict() deep-copies every field recursively on each frame
+        angles = self.angles
+        return {
+            "fps": self.fps,
+            "latency_ms": self.latency_ms,
+            "latency_ms_p50": self.latency_ms_p50,
+            "latency_ms_p95": self.latency_ms_p95,
+            "joints": self.joints.to_list(),
+            "angles": {
+                "left_elbow": angles.left_elbow,
+                "right_elbow": angles.right_elbow,
+                "left_knee": angles.left_knee,
+                "right_knee": angles.right_knee,
+                "left_hip": angles.left_hip,
+                "right_hip": angles.right_hip,
+                "shoulder_hip_alignment": angles.shoulder_hip_alignment,
+                "torso_forward": angles.torso_forward,
+            },
+            "quality": self.quality,
+            "quality_avg": self.quality_avg,
+            "feedback": self.feedback,
+            "feedback_code": self.feedback_code,
+            "exercise": self.exercise,
+            "phase": self.phase,
+            "phase_label": self.phase_label,
+            "rep_count": self.rep_count,
+            "current_exercise_reps": self.current_exercise_reps,
+            "rep_totals": dict(self.rep_totals),
+            "timestamp_utc": self.timestamp_utc,
+            "frame_b64": self.frame_b64,
+            "frame_id": self.frame_id,
+        }
+
+
+_EMPTY_JOINTS = PoseJointsSoA((), np.empty((0, 3)), np.empty(0))
+_MOCK_JOINTS = PoseJointsSoA.from_rows(
+    (
+        ("left_shoulder", 0.45, 0.35, -0.1, 0.9),
+        ("right_shoulder", 0.55, 0.35, -0.1, 0.9),
+        ("left_hip", 0.47, 0.55, -0.1, 0.9),
+        ("right_hip", 0.53, 0.55, -0.1, 0.9),
+        ("left_knee", 0.47, 0.75, -0.1, 0.9),
+        ("right_knee", 0.53, 0.75, -0.1, 0.9),
+        ("left_elbow", 0.42, 0.45, -0.1, 0.9),
+        ("right_elbow", 0.58, 0.45, -0.1, 0.9),
+        ("left_wrist", 0.40, 0.52, -0.1, 0.9),
+        ("right_wrist", 0.60, 0.52, -0.1, 0.9),
+        ("left_ankle", 0.47, 0.92, -0.1, 0.9),
+        ("right_ankle", 0.53, 0.92, -0.1, 0.9),
+    )
+)
+
+
+class _CaptureThread(threading.Thread):
+    """Keeps the camera drained on a background thread and decodes frames only on demand.
+
+    The loop calls ``grab()`` continuously (no decode), so the driver queue never
+    holds stale images; ``retrieve()`` runs only when a consumer has asked for a
+    frame. ``take`` hands over the decoded frame and, by default, requests the next
+    one so its decode overlaps with pose inference. While the pipeline is idle or
+    skipping frames nobody asks, and the camera is only grabbed.
+    """
+
+    def __init__(self, cap) -> None:
+        super().__init__(name="camera-capture", daemon=True)
+        self.cap = cap
+        self.failed = False
+        self.stopped = False
+        self._cond = threading.Condition()
+        self._latest: Optional[np.ndarray] = None
+        self._last_read: Optional[np.ndarray] = None
+        self._wanted = False
+
+    def run(self) -> None:
+        while not self.stopped:
+            ok = self.cap.grab()
+            frame = None
+            if ok and self._wanted:
+                ok, frame = self.cap.retrieve()
+            with self._cond:
+                if not ok:
+                    self.failed = True
+                    self._cond.notify_all()
+                    return
+                if frame is not None:
+                    self._latest = self._last_read = frame
+                    self._wanted = False
+                    self._cond.notify()
+
+    def take(self, timeout: float, prefetch: bool = True) -> Optional[np.ndarray]:
+        """Return the decoded frame, waiting up to ``timeout`` seconds for one.
+
+        With ``prefetch`` the next grabbed frame is decoded ahead of the next call.
+        """
+        with self._cond:
+            if self._latest is None and not self.failed:
+                self._wanted = True
+                self._cond.wait(timeout)
+            frame, self._latest = self._latest, None
+            self._wanted = prefetch
+        return frame
+
+    def skip(self) -> None:
+        """The next frame is not needed: drop any pending decode request."""
+        with self._cond:
+            self._wanted = False
+            self._latest = None
+
+    def peek(self) -> Optional[np.ndarray]:
+        """Copy of the most recent frame, without consuming it (debug tooling draws on it)."""
+        with self._cond:
+            self._wanted = True  # keep the debug view live even when the pipeline is idle
+            return None if self._last_read is None else self._last_read.copy()
+
+    def stop(self) -> None:
+        self.stopped = True
+        self.join(timeout=1.0)
+
+
+class _LandmarkRows:
+    """MediaPipe-shaped ``pose_landmarks`` over an (N, 4) x/y/z/visibility array.
+
+    ``array`` is read directly by the pipeline; the per-landmark ``landmark``
+    objects are only built if someone asks for them.
+    """
+
+    __slots__ = ("array", "_landmark")
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+        self._landmark: Optional[list] = None
+
+    @property
+    def landmark(self) -> list:
+        if self._landmark is None:
+            self._landmark = [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in self.array.tolist()]
+        return self._landmark
+
+
+class _TFLitePose:
+    """BlazePose landmark ``.tflite`` model behind the ``mp.solutions.pose.Pose.process`` interface.
+
+    The frame is letterboxed into the model input, int8/uint8 tensors are
+    (de)quantized with the model's own parameters and only the 33 landmark rows
+    are decoded. ``process`` returns an object shaped like MediaPipe's result
+    (``.pose_landmarks.landmark[i].x/y/z/visibility``, normalized to the frame);
+    ``.pose_landmarks.array`` holds the same rows as one (33, 4) array.
+    """
+
+    def __init__(self, model_path: str, num_threads: int = 1, delegate: str = "") -> None:
+        assert TFLiteInterpreter is not None and cv2 is not None
+        delegates = [load_delegate(delegate)] if delegate else None
+        self._interp = TFLiteInterpreter(
+            model_path=model_path,
+            experimental_delegates=delegates,
+            num_threads=max(1, int(num_threads)),
+        )
+        self._interp.allocate_tensors()
+        inp = self._interp.get_input_details()[0]
+        self._in_index = inp["index"]
+        self._in_dtype = inp["dtype"]
+        self._in_quant = inp.get("quantization", (0.0, 0))
+        _, self._in_h, self._in_w, _ = (int(v) for v in inp["shape"])
+        outputs = self._interp.get_output_details()
+        # Landmarks: the first output holding >= 33 rows of 5 values (x, y, z, visibility, presence)
+        self._lm_out = next(
+            o for o in outputs
+            if int(np.prod(o["shape"])) >= _BLAZEPOSE_LANDMARKS * 5 and int(np.prod(o["shape"])) % 5 == 0
+        )
+        # Pose presence flag: a single-value output, when the model has one
+        self._flag_out = next((o for o in outputs if int(np.prod(o["shape"])) == 1), None)
+        self._canvas = np.zeros((self._in_h, self._in_w, 3), dtype=np.uint8)
+        # Quantized inputs: pixel value -> input code for all 256 values, so each frame is one lookup
+        self._in_lut: Optional[np.ndarray] = None
+        if self._in_dtype != np.float32:
+            q_scale, q_zero = self._in_quant
+            if q_scale:
+                info = np.iinfo(self._in_dtype)
+                codes = np.rint(np.arange(256) / 255.0 / q_scale + q_zero)
+                self._in_lut = np.clip(codes, info.min, info.max).astype(self._in_dtype)
+
+    @staticmethod
+    def _dequantize(detail: dict, raw: np.ndarray) -> np.ndarray:
+        scale, zero = detail.get("quantization", (0.0, 0))
+        if scale and raw.dtype != np.float32:
+            return (raw.astype(np.float32) - zero) * scale
+        return raw.astype(np.float32, copy=False)
+
+    def process(self, rgb: np.ndarray):
+        h, w = rgb.shape[:2]
+        scale = min(self._in_w / w, self._in_h / h)
+        nw, nh = max(1, int(w * scale)), max(1, int(h * scale))
+        pad_x, pad_y = (self._in_w - nw) // 2, (self._in_h - nh) // 2
+        canvas = self._canvas
+        canvas.fill(0)
+        canvas[pad_y:pad_y + nh, pad_x:pad_x + nw] = cv2.resize(rgb, (nw, nh), interpolation=cv2.INTER_AREA)
+        if self._in_dtype == np.float32:
+            tensor = canvas.astype(np.float32) / 255.0
+        elif self._in_lut is not None:
+            tensor = self._in_lut[canvas]
+        else:
+            tensor = canvas.astype(self._in_dtype)
+        self._interp.set_tensor(self._in_index, tensor[None])
+        self._interp.invoke()
+
+        if self._flag_out is not None:
+            flag = float(self._dequantize(self._flag_out, self._interp.get_tensor(self._flag_out["index"])).ravel()[0])
+            presence = flag if 0.0 <= flag <= 1.0 else 1.0 / (1.0 + math.exp(-flag))
+            if presence < 0.5:
+                return SimpleNamespace(pose_landmarks=None)
+        raw = self._dequantize(self._lm_out, self._interp.get_tensor(self._lm_out["index"]))
+        lm = raw.reshape(-1, 5)[:_BLAZEPOSE_LANDMARKS]
+        # Undo the letterbox: model pixels -> normalized frame coordinates
+        rows = np.empty((len(lm), 4), dtype=np.float64)
+        rows[:, 0] = (lm[:, 0] - pad_x) / nw
+        rows[:, 1] = (lm[:, 1] - pad_y) / nh
+        rows[:, 2] = lm[:, 2] / nw
+        rows[:, 3] = 1.0 / (1.0 + np.exp(-lm[:, 3]))
+        return SimpleNamespace(pose_landmarks=_LandmarkRows(rows))
+
+    def close(self) -> None:
+        self._interp = None
 
 
 class PoseEstimator:
     """Pose estimation pipeline with MediaPipe fallback to mock data."""
 
     _SPANISH_PHASE = {"up": "Ascenso", "down": "Descenso"}
+    # Row of each exercise in the (down, up) thresholds table; unknown exercises use squat
+    _EXER_IDX = {"squat": 0, "pushup": 1, "crunch": 2}
 
     def __init__(self) -> None:
         self.settings = get_settings()
@@ -90,36 +698,72 @@ class PoseEstimator:
         self.feedback_code: str = "idle"
         self.counting_enabled: bool = False
         self._latencies: deque[float] = deque(maxlen=max(5, self.settings.pose_latency_window))
+        self._latency_p50 = WindowedQuantile(0.50, self._latencies.maxlen)
+        self._latency_p95 = WindowedQuantile(0.95, self._latencies.maxlen)
         self._quality_window: deque[float] = deque(maxlen=max(5, self.settings.pose_quality_window))
         self._quality_sum: float = 0.0
         self._quality_count: int = 0
-        self._fps_window: deque[float] = deque(maxlen=60)
+        self._fps_window = RollingMean(60)
         self._last_frame_ts: Optional[float] = None
-        self._mock: bool = bool(self.settings.vision_mock or cv2 is None or mp is None)
+        use_tflite = bool(self.settings.pose_tflite_model_path and TFLiteInterpreter is not None)
+        self._mock: bool = bool(self.settings.vision_mock or cv2 is None or (mp is None and not use_tflite))
         self._pose = None
         self._cap = None
-        self._mp_landmarks = None
+        self._capture: Optional[_CaptureThread] = None
         self._mock_progress: float = 0.0
+        self._mock_frame_buf: Optional[np.ndarray] = None
         self._frame_counter: int = 0
-        self._last_joints: List[PoseJoint] = []
+        self._last_joints: PoseJointsSoA = _EMPTY_JOINTS
         self._last_angles: PoseAngles = PoseAngles()
+        # Landmarks (x, y, z) the cached angles were computed from; near-identical frames reuse them
+        self._prev_xyz: Optional[np.ndarray] = None
+        self._pose_static: bool = False
+        self._static_state: Optional[Tuple[str, str, bool]] = None
+        # Consecutive still frames that went through rep counting (each pushed the same primary angle)
+        self._static_run: int = 0
+        self._last_quality: float = 0.0
+        self._parts_cache: Optional[Tuple[PoseAngles, str, str, Dict[str, str]]] = None
+        # Last encoded HUD frame and the inputs it was drawn from
+        self._hud_frame: Optional[np.ndarray] = None
+        self._hud_angles: Optional[PoseAngles] = None
+        self._hud_sig: Optional[Tuple[int, str, str]] = None
+        self._hud_key: Optional[tuple] = None
+        self._hud_jpeg: Optional[bytes] = None
+        self._hud_b64: Optional[str] = None
+        self._hud_frame_id: int = 0
+        # Guards the encoded-HUD state above when a background encoder publishes into it
+        self._hud_lock = threading.Lock()
+        self._hud_executor: Optional[ThreadPoolExecutor] = None
+        self._hud_future: Optional[Future] = None
+        # HUD encode gating: cap the encode rate and stop encoding while no client reads frames
+        # (the read clock starts "live" so the first client gets a fresh frame right away)
+        self._hud_fps_target: float = max(0.0, float(getattr(self.settings, "hud_fps_target", 0.0)))
+        self._last_hud_ts: float = 0.0
+        self._hud_read_ts: float = time.monotonic()
+        # Last result produced while counting is off; idle frames in between reuse it
+        self._idle_result: Optional[PoseResult] = None
+        self._idle_counter: int = 0
         # Front-facing robustness: smooth primary angle and require confirmation frames
-        self._angle_window: deque[float] = deque(maxlen=5)
+        self._angle_window = RollingMean(5)
         self._phase_condition_frames: int = 0
-        self._thresholds = {
-            "squat": {
-                "down": float(self.settings.squat_down_angle),
-                "up": float(self.settings.squat_up_angle),
-            },
-            "pushup": {
-                "down": float(self.settings.pushup_down_angle),
-                "up": float(self.settings.pushup_up_angle),
-            },
-            "crunch": {
-                "down": float(self.settings.crunch_down_angle),
-                "up": float(self.settings.crunch_up_angle),
-            },
-        }
+        s = self.settings
+        self._thr = np.array(
+            [
+                [s.squat_down_angle, s.squat_up_angle],
+                [s.pushup_down_angle, s.pushup_up_angle],
+                [s.crunch_down_angle, s.crunch_up_angle],
+            ],
+            dtype=np.float64,
+        )
+        self._exer_idx: int = 0
+        # (down, up) of the current exercise as plain floats, resolved on exercise change
+        self._down_up: Tuple[float, float] = (0.0, 0.0)
+        self._part_margin: float = 5.0
+        self._quality_scale: float = 12.0
+        self._primary_spec = _PRIMARY_ANGLE_SPEC["squat"]
+        self._resolve_exercise()
+        self._hyster = float(getattr(s, "pose_rep_hysteresis_deg", 8.0))
+        self._need_frames = max(1, int(getattr(s, "pose_rep_confirm_frames", 2)))
 
         if not self._mock:
             try:
@@ -130,38 +774,77 @@ class PoseEstimator:
 
         if self._mock:
             logger.info("PoseEstimator running in mock mode (VISION_MOCK=1 or missing deps)")
+        elif self._capture is not None and self.settings.hud_async_encode:
+            # Camera frames arrive on their own thread; draw + JPEG encode on another one so the
+            # HUD never delays the next inference (cv2 releases the GIL while encoding)
+            self._hud_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HudEncoder")
+
+        # Reused buffers for the numba angle kernel; one warm-up call pays the JIT/cache load here
+        self._pts_buf = np.full((len(_KERNEL_JOINTS), 3), np.nan, dtype=np.float32)
+        self._angles_out = np.empty(len(_ANGLE_TRIPLETS) + 1, dtype=np.float32)
+        if _jit_compute_all is not None:
+            _jit_compute_all(self._pts_buf, _TRIPLET_IDX, self._angles_out)
 
     # --- Public API -----------------------------------------------------
 
     def analyze_frame(self) -> PoseResult:
         """Capture a frame, compute joints/angles, rep counting, and metrics."""
+        if not self.counting_enabled and self._idle_result is not None:
+            # Paused/idle: run the pipeline on 1 of (skip+1) calls only, the UI just needs a live preview
+            self._idle_counter += 1
+            skip = max(0, int(getattr(self.settings, "pose_idle_skip", 0)))
+            if skip and self._idle_counter % (skip + 1):
+                if self._capture is None and self._cap is not None:
+                    self._cap.grab()  # keep the driver queue drained so the next processed frame is fresh
+                # latency_ms=None marks the reuse so consumers don't count the old latency again
+                return replace(self._idle_result, fps=round(self._update_fps(), 2), latency_ms=None, timestamp_utc=time.time())
         start = time.perf_counter()
         joints, angles, frame = self._process_frame()
         latency_ms = (time.perf_counter() - start) * 1000.0
         self._latencies.append(latency_ms)
+        self._latency_p50.add(latency_ms)
+        self._latency_p95.add(latency_ms)
         fps = self._update_fps()
         latency_p50, latency_p95 = self._latency_percentiles()
 
+        # Body unchanged since the last computed frame and same session state: once the smoothing
+        # window holds only the still pose's angle and no phase change is pending, the smoothed angle,
+        # phase and feedback would come out identical, so reuse them and skip the kinematics.
+        # Until then (e.g. held still at the bottom with 1 of 2 confirm frames) counting keeps running.
+        state = (self.exercise, self.phase, self.counting_enabled)
+        settled = self._static_run >= self._angle_window.size and self._phase_condition_frames == 0
+        if self._pose_static and settled and state == self._static_state:
+            quality = self._last_quality
+            if self.counting_enabled:
+                self._quality_window.append(quality)
+                self._quality_sum += quality
+                self._quality_count += 1
+            avg_quality = self.get_average_quality()
+            feedback_code, feedback = self.feedback_code, self.feedback
         # Gate quality and rep counting by session activity (counting_enabled)
         # - When not active/paused, don't count reps and don't accumulate quality metrics.
-        if self.counting_enabled:
-            quality = self._compute_quality(angles)
+        elif self.counting_enabled:
+            self._static_run = self._static_run + 1 if self._pose_static else 0
+            # Smoothed once per frame; quality, reps and feedback all read the same value
+            primary = self._primary_angle_smoothed(angles)
+            quality = self._compute_quality(primary)
             self._quality_window.append(quality)
             self._quality_sum += quality
             self._quality_count += 1
             avg_quality = self.get_average_quality()
-            self._update_reps(angles)
-            feedback_code, feedback = self._feedback_for_angles(angles, quality)
+            self._update_reps(primary)
+            feedback_code, feedback = self._feedback_for_angles(angles, primary, quality)
         else:
             quality = 0.0
-            # Do not change accumulated average while inactive/paused
+            self._static_run = 0
+            # Do not change accumulated average while inactive/paused; phases do not advance either
             avg_quality = self.get_average_quality()
-            # Still update phase transitions internally but do not increment reps
-            self._update_reps(angles)
-            feedback_code, feedback = "idle", "Listo para empezar"
+            feedback_code, feedback = _IDLE_FEEDBACK
 
         self.feedback_code = feedback_code
         self.feedback = feedback
+        self._last_quality = quality
+        self._static_state = (self.exercise, self.phase, self.counting_enabled)
 
         frame_b64 = self._encode_frame(frame, joints, quality, angles)
 
@@ -178,12 +861,14 @@ class PoseEstimator:
             feedback_code=feedback_code,
             exercise=self.exercise,
             phase=self.phase,
-            phase_label=self._SPANISH_PHASE.get(self.phase, self.phase.title()),
+            phase_label=self.get_phase_label(),
             rep_count=self.rep_count,
             current_exercise_reps=self.rep_totals.get(self.exercise, 0),
             rep_totals=dict(self.rep_totals),
             frame_b64=frame_b64,
+            frame_id=self._hud_frame_id if self._hud_jpeg is not None else None,
         )
+        self._idle_result = None if self.counting_enabled else result
         return result
 
     def get_average_quality(self) -> float:
@@ -192,20 +877,24 @@ class PoseEstimator:
         return self._quality_sum / self._quality_count
 
     def get_fps_avg(self) -> float:
-        if not self._fps_window:
-            return 0.0
-        return sum(self._fps_window) / len(self._fps_window)
+        return self._fps_window.mean()
 
     def get_latency_samples_count(self) -> int:
         return len(self._latencies)
 
-    def get_latency_p50_p95_ms(self) -> Tuple[float, float]:
-        """Return latency percentiles in milliseconds."""
-        return self._latency_percentiles()
+    def get_latency_p50_p95_ms(self, exact: bool = False) -> Tuple[float, float]:
+        """Return latency percentiles in milliseconds.
+
+        Both cover the last ``pose_latency_window`` frames: ``exact`` selects nearest-rank values
+        over that window instead of the streaming estimates; meant for cold paths such as the
+        debug metrics endpoint.
+        """
+        return self._window_percentiles() if exact else self._latency_percentiles()
 
     def reset_session(self, exercise: Optional[str] = None, *, preserve_totals: bool = False) -> None:
         if exercise:
             self.exercise = exercise.lower()
+            self._resolve_exercise()
         self.phase = "up"
         self.rep_count = 0
         if preserve_totals:
@@ -216,6 +905,8 @@ class PoseEstimator:
         self.feedback = "Listo para empezar"
         self.feedback_code = "idle"
         self._latencies.clear()
+        self._latency_p50 = WindowedQuantile(0.50, self._latencies.maxlen)
+        self._latency_p95 = WindowedQuantile(0.95, self._latencies.maxlen)
         self._quality_window.clear()
         self._quality_sum = 0.0
         self._quality_count = 0
@@ -223,6 +914,7 @@ class PoseEstimator:
         self._last_frame_ts = None
         self._mock_progress = 0.0
         self.counting_enabled = False
+        self._idle_result = None
 
     def set_exercise(self, exercise: str, *, reset: bool = False) -> None:
         exercise_name = exercise.lower()
@@ -232,16 +924,29 @@ class PoseEstimator:
             self.counting_enabled = was_enabled
             return
         self.exercise = exercise_name
+        self._resolve_exercise()
         self.phase = "up"
         self.rep_totals.setdefault(self.exercise, 0)
         self.feedback = "Ejercicio actualizado"
         self.feedback_code = "exercise_changed"
+        self._idle_result = None
+
+    def _resolve_exercise(self) -> None:
+        """Look up the per-exercise thresholds and primary-angle rule once per exercise change."""
+        self._exer_idx = self._EXER_IDX.get(self.exercise, 0)
+        down, up = self._thr[self._exer_idx].tolist()
+        self._down_up = (down, up)
+        self._part_margin = part_margin(down, up)
+        self._quality_scale = 120.0 / max(10.0, abs(up - down))
+        self._primary_spec = _PRIMARY_ANGLE_SPEC.get(self.exercise, _PRIMARY_ANGLE_SPEC["crunch"])
 
     def set_counting_enabled(self, enabled: bool) -> None:
         self.counting_enabled = bool(enabled)
+        self._idle_result = None
 
     def get_phase_label(self) -> str:
-        return self._SPANISH_PHASE.get(self.phase, self.phase.title())
+        # `or` instead of a .get default: title() would otherwise run on every call
+        return self._SPANISH_PHASE.get(self.phase) or self.phase.title()
 
     # --- Debug accessors (used by /debug endpoints) --------------------
     @property
@@ -252,29 +957,53 @@ class PoseEstimator:
     def pose(self):  # pragma: no cover - debug tooling
         return self._pose
 
+    def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:  # pragma: no cover - debug tooling
+        """Read a camera frame without racing the capture thread when it is running."""
+        if self._capture is not None:
+            # Pace like a blocking cap.read() would, instead of spinning on the same frame
+            time.sleep(1.0 / max(1, int(self.settings.camera_fps or 15)))
+            frame = self._capture.peek()
+            return frame is not None, frame
+        if self._cap is None:
+            return False, None
+        return self._cap.read()
+
     # --- Internal helpers -----------------------------------------------
 
     def _init_realtime_pipeline(self) -> None:  # pragma: no cover - hardware path
-        assert cv2 is not None and mp is not None
+        assert cv2 is not None
         try:
             # Limit OpenCV threads on low-power devices (reduces contention)
             if hasattr(cv2, "setNumThreads"):
                 cv2.setNumThreads(int(self.settings.opencv_threads))
         except Exception:
             pass
-        mp_pose = mp.solutions.pose
-        self._pose = mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=int(self.settings.model_complexity),
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
-        self._mp_landmarks = mp_pose.PoseLandmark
+        tflite_path = self.settings.pose_tflite_model_path
+        if tflite_path and TFLiteInterpreter is not None:
+            # Quantized BlazePose through tflite-runtime (XNNPACK by default, optional external delegate)
+            self._pose = _TFLitePose(
+                tflite_path,
+                num_threads=int(self.settings.opencv_threads),
+                delegate=self.settings.pose_tflite_delegate,
+            )
+            logger.info("Pose backend: TFLite model {}", tflite_path)
+        else:
+            assert mp is not None
+            mp_pose = mp.solutions.pose
+            self._pose = mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=int(self.settings.model_complexity),
+                enable_segmentation=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
         self._cap = cv2.VideoCapture(int(self.settings.camera_index))
         if not self._cap or not self._cap.isOpened():
             raise RuntimeError("Camera could not be opened")
         self._configure_camera()
+        if self.settings.camera_threaded:
+            self._capture = _CaptureThread(self._cap)
+            self._capture.start()
 
     def _configure_camera(self) -> None:  # pragma: no cover - hardware path
         assert cv2 is not None and self._cap is not None
@@ -295,129 +1024,134 @@ class PoseEstimator:
         except Exception:
             pass
 
-    def _process_frame(self) -> Tuple[List[PoseJoint], PoseAngles, Optional[np.ndarray]]:
+    def _process_frame(self) -> Tuple[PoseJointsSoA, PoseAngles, Optional[np.ndarray]]:
+        self._pose_static = False
         if self._mock:
             return self._mock_frame()
-        assert self._cap is not None and cv2 is not None and mp is not None
-        ok, frame = self._cap.read()
+        assert self._cap is not None and cv2 is not None
+        # Frame skipping: process only 1 of (skip+1) frames, reuse last angles/joints otherwise
+        self._frame_counter += 1
+        skip = max(0, int(getattr(self.settings, "pose_frame_skip", 0)))
+        do_process = skip == 0 or self._frame_counter % (skip + 1) == 0 or not self._last_joints
+        hud_off = bool(getattr(self.settings, "hud_disable", False))
+        if self._capture is not None:
+            if not do_process and hud_off:
+                # Skipped frame and no HUD to draw: the capture thread keeps grabbing, nothing is decoded
+                self._capture.skip()
+                frame = None
+                ok = not self._capture.failed
+            else:
+                # While counting, the next frame is decoded during this inference; idle previews and
+                # skipped frames without a HUD don't prefetch, so no frame is decoded just to be dropped
+                frame = self._capture.take(
+                    timeout=2.0 / max(1, int(self.settings.camera_fps or 15)),
+                    prefetch=self.counting_enabled and (skip == 0 or not hud_off),
+                )
+                ok = not self._capture.failed
+                if ok and frame is None:
+                    # Camera stalled for a couple of frame intervals: keep the last result
+                    return self._last_joints, self._last_angles, None
+        else:
+            # grab() advances the stream without decoding; retrieve() decodes only frames we will use
+            ok = self._cap.grab()
+            frame = None
+            if ok and (do_process or not hud_off):
+                ok, frame = self._cap.retrieve()
         if not ok:
             logger.warning("Camera read failed; switching to mock mode")
             self._mock = True
             return self._mock_frame()
-        # Frame skipping: process only 1 of (skip+1) frames, reuse last angles/joints otherwise
-        self._frame_counter += 1
-        do_process = True
-        skip = max(0, int(getattr(self.settings, "pose_frame_skip", 0)))
-        if skip > 0 and (self._frame_counter % (skip + 1) != 0) and self._last_joints and self._last_angles:
-            do_process = False
 
         results = None
         if do_process:
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # Optional downscale for inference to speed up MediaPipe
+            # Optional downscale for inference to speed up MediaPipe; resize the BGR frame first so
+            # the colour conversion only touches the small image. `frame` stays full-size for the HUD.
+            small = frame
             target_long = max(0, int(getattr(self.settings, "pose_input_long_side", 0)))
-            if target_long and max(rgb.shape[0], rgb.shape[1]) > target_long:
-                h, w = rgb.shape[:2]
+            h, w = frame.shape[:2]
+            if target_long and max(h, w) > target_long:
                 scale = float(target_long) / float(max(h, w))
                 new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-                rgb_small = cv2.resize(rgb, new_size, interpolation=cv2.INTER_AREA)
-                results = self._pose.process(rgb_small) if self._pose else None  # type: ignore[attr-defined]
-            else:
-                results = self._pose.process(rgb) if self._pose else None  # type: ignore[attr-defined]
+                small = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+            rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+            results = self._pose.process(rgb) if self._pose else None  # type: ignore[attr-defined]
         if not results or not results.pose_landmarks:
             if do_process:
                 # No detection; reset last values
-                self._last_joints = []
+                self._last_joints = _EMPTY_JOINTS
                 self._last_angles = PoseAngles()
+                self._prev_xyz = None
             # Return previous if available to keep FPS high; else empty
-            return list(self._last_joints), self._last_angles, frame
-        landmarks = results.pose_landmarks.landmark
-        points = self._landmark_points(landmarks)
-        joints = [
-            PoseJoint(name=name, x=pt[0], y=pt[1], z=pt[2], score=pt[3])
-            for name, pt in points.items()
-        ]
-        angles = self._compute_angles(points)
-        # Cache for skipped frames
-        self._last_joints = list(joints)
+            return self._last_joints, self._last_angles, frame
+        rows = getattr(results.pose_landmarks, "array", None)
+        # TFLite adapter: landmarks already decoded into an array; MediaPipe: one pass over its objects
+        key = rows[_KEY_IDS] if rows is not None else self._landmark_array(results.pose_landmarks.landmark)
+        xyz = key[:, :3]
+        prev = self._prev_xyz
+        if prev is not None and prev.shape == xyz.shape and self._last_joints and float(np.max(np.abs(xyz - prev))) < _STATIC_EPS:
+            # Subject is still: keep the angles computed at `prev` (compared against it, not the
+            # previous frame, so slow drift still triggers a recompute)
+            self._pose_static = True
+            return self._last_joints, self._last_angles, frame
+        self._prev_xyz = xyz
+        # Views into this frame's own key array: no per-joint objects, nothing shared across frames
+        joints = PoseJointsSoA(_KEY_NAMES, xyz, key[:, 3])
+        angles = self._angles_from_array(xyz)
+        # Cache for skipped frames (results are never mutated, so sharing the instance is safe)
+        self._last_joints = joints
         self._last_angles = angles
         return joints, angles, frame
 
-    def _landmark_points(self, landmarks) -> Dict[str, Tuple[float, float, float, float]]:
-        if mp is None:
-            return {}
-        lm = self._mp_landmarks
-        indices = {
-            "left_shoulder": lm.LEFT_SHOULDER,
-            "right_shoulder": lm.RIGHT_SHOULDER,
-            "left_elbow": lm.LEFT_ELBOW,
-            "right_elbow": lm.RIGHT_ELBOW,
-            "left_wrist": lm.LEFT_WRIST,
-            "right_wrist": lm.RIGHT_WRIST,
-            "left_hip": lm.LEFT_HIP,
-            "right_hip": lm.RIGHT_HIP,
-            "left_knee": lm.LEFT_KNEE,
-            "right_knee": lm.RIGHT_KNEE,
-            "left_ankle": lm.LEFT_ANKLE,
-            "right_ankle": lm.RIGHT_ANKLE,
-            "nose": lm.NOSE,
-        }
-        points: Dict[str, Tuple[float, float, float, float]] = {}
-        for name, idx in indices.items():
-            landmark = landmarks[int(idx)]
-            points[name] = (
-                float(landmark.x),
-                float(landmark.y),
-                float(landmark.z),
-                float(getattr(landmark, "visibility", 1.0)),
-            )
-        return points
+    @staticmethod
+    def _landmark_array(landmarks) -> np.ndarray:
+        """(13, 4) x/y/z/visibility rows in ``_KEY_NAMES`` order, read in one pass over the landmarks."""
+        arr = np.fromiter(
+            (v for lm in landmarks for v in (lm.x, lm.y, lm.z, getattr(lm, "visibility", 1.0))),
+            dtype=np.float64,
+            count=len(landmarks) * 4,
+        ).reshape(-1, 4)
+        return arr[_KEY_IDS]
 
     def _compute_angles(self, points: Dict[str, Tuple[float, float, float, float]]) -> PoseAngles:
-        def get(names: Iterable[str]) -> Optional[Tuple[float, float, float]]:
-            coords = []
-            for n in names:
-                if n not in points:
-                    return None
-                coords.append(points[n][:3])
-            return tuple(coords)  # type: ignore[return-value]
-
-        def angle(a: Tuple[float, float, float], b: Tuple[float, float, float], c: Tuple[float, float, float]) -> float:
-            v1 = np.array(a) - np.array(b)
-            v2 = np.array(c) - np.array(b)
-            norm = np.linalg.norm(v1) * np.linalg.norm(v2)
-            if norm == 0:
-                return 0.0
-            cos = np.clip(np.dot(v1, v2) / norm, -1.0, 1.0)
-            return math.degrees(math.acos(cos))
-
-        left_elbow = angle(*get(("left_shoulder", "left_elbow", "left_wrist"))) if get(("left_shoulder", "left_elbow", "left_wrist")) else None
-        right_elbow = angle(*get(("right_shoulder", "right_elbow", "right_wrist"))) if get(("right_shoulder", "right_elbow", "right_wrist")) else None
-        left_knee = angle(*get(("left_hip", "left_knee", "left_ankle"))) if get(("left_hip", "left_knee", "left_ankle")) else None
-        right_knee = angle(*get(("right_hip", "right_knee", "right_ankle"))) if get(("right_hip", "right_knee", "right_ankle")) else None
-        left_hip = angle(*get(("left_shoulder", "left_hip", "left_knee"))) if get(("left_shoulder", "left_hip", "left_knee")) else None
-        right_hip = angle(*get(("right_shoulder", "right_hip", "right_knee"))) if get(("right_shoulder", "right_hip", "right_knee")) else None
-        shoulder_hip = angle(*get(("left_shoulder", "left_hip", "right_hip"))) if get(("left_shoulder", "left_hip", "right_hip")) else None
+        """Name-keyed adapter over ``_angles_from_array``; a missing joint yields NaN -> None."""
+        xyz = np.fromiter(
+            (c for name in _KEY_NAMES for c in points.get(name, _MISSING_POINT)[:3]),
+            dtype=np.float64,
+            count=len(_KEY_NAMES) * 3,
+        ).reshape(-1, 3)
+        return self._angles_from_array(xyz)
+
+    def _angles_from_array(self, xyz: np.ndarray) -> PoseAngles:
+        if _jit_compute_all is not None:
+            return self._compute_angles_jit(xyz)
+        # All (a, b, c) triplets in one (7, 3, 3) batch
+        pts = xyz[_ANGLE_ROWS].reshape(len(_ANGLE_TRIPLETS), 3, 3)
+        v1 = pts[:, 0] - pts[:, 1]
+        v2 = pts[:, 2] - pts[:, 1]
+        dots = np.einsum("ij,ij->i", v1, v2)
+        norms = np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cos = np.clip(dots / np.where(norms == 0, 1.0, norms), -1.0, 1.0)
+        degrees = np.where(norms == 0, 0.0, np.degrees(np.arccos(cos)))
+        values = {
+            name: (None if math.isnan(v) else v)
+            for name, v in zip(_ANGLE_FIELDS, degrees.tolist())
+        }
 
+        # Torso lean: left shoulder vs hip midpoint, reusing the shoulder_hip_alignment triplet
+        shoulder, left_hip, right_hip = pts[-1]
+        vec = shoulder - (left_hip + right_hip) / 2.0
         torso_angle: Optional[float] = None
-        if all(n in points for n in ("left_shoulder", "left_hip", "right_hip")):
-            shoulder = np.array(points["left_shoulder"][:3])
-            hip_mid = (
-                np.array(points["left_hip"][:3]) + np.array(points["right_hip"][:3])
-            ) / 2.0
-            vec = shoulder - hip_mid
+        if not np.isnan(vec).any():
             torso_angle = math.degrees(math.atan2(abs(vec[0]), abs(vec[1]) + 1e-6))
 
-        return PoseAngles(
-            left_elbow=left_elbow,
-            right_elbow=right_elbow,
-            left_knee=left_knee,
-            right_knee=right_knee,
-            left_hip=left_hip,
-            right_hip=right_hip,
-            shoulder_hip_alignment=shoulder_hip,
-            torso_forward=torso_angle,
-        )
+        return PoseAngles(**values, torso_forward=torso_angle)
+
+    def _compute_angles_jit(self, xyz: np.ndarray) -> PoseAngles:
+        self._pts_buf[:] = xyz[_KERNEL_ROWS]
+        _jit_compute_all(self._pts_buf, _TRIPLET_IDX, self._angles_out)
+        values = [None if math.isnan(v) else v for v in self._angles_out.tolist()]
+        return PoseAngles(**dict(zip(_ANGLE_FIELDS, values)), torso_forward=values[-1])
 
     def _update_fps(self) -> float:
         now = time.perf_counter()
@@ -429,73 +1163,56 @@ class PoseEstimator:
         if delta <= 0:
             return float(self.settings.camera_fps or 0)
         fps = 1.0 / delta
-        self._fps_window.append(fps)
-        return sum(self._fps_window) / len(self._fps_window)
+        return self._fps_window.push(fps)
 
     def _latency_percentiles(self) -> Tuple[float, float]:
-        if not self._latencies:
+        return self._latency_p50.value(), self._latency_p95.value()
+
+    def _window_percentiles(self) -> Tuple[float, float]:
+        n = len(self._latencies)
+        if n == 0:
             return 0.0, 0.0
-        data = list(self._latencies)
-        try:
-            p50 = float(np.percentile(data, 50))
-            p95 = float(np.percentile(data, 95))
-        except Exception:
-            p50 = float(median(data))
-            p95 = float(sorted(data)[max(0, int(len(data) * 95 / 100) - 1)])
-        return p50, p95
-
-    def _compute_quality(self, angles: PoseAngles) -> float:
-        thresholds = self._thresholds.get(self.exercise, self._thresholds["squat"])
-        down = thresholds["down"]
-        up = thresholds["up"]
-        # Quality compares against expected posture for current phase
-        target = up if self.phase == "up" else down
-        angle_value = self._primary_angle_smoothed(angles)
+        # Introselect (O(n)) places both ranks without sorting the whole window
+        arr = np.fromiter(self._latencies, dtype=np.float64, count=n)
+        k50 = max(0, math.ceil(0.50 * n) - 1)
+        k95 = max(0, math.ceil(0.95 * n) - 1)
+        arr.partition([k50, k95])
+        return float(arr[k50]), float(arr[k95])
+
+    def _compute_quality(self, angle_value: Optional[float]) -> float:
         if angle_value is None:
             return 0.0
-        error = abs(angle_value - target)
-        # Normalize error by the angular range and clamp
-        range_span = max(10.0, abs(up - down))
-        score = max(0.0, 100.0 - (error / range_span) * 120.0)
-        return max(0.0, min(100.0, score))
+        # Quality compares against expected posture for current phase
+        target = self._down_up[1] if self.phase == "up" else self._down_up[0]
+        # Error normalized by the angular range (scale resolved per exercise), clamped to [0, 100]
+        score = 100.0 - abs(angle_value - target) * self._quality_scale
+        return score if score > 0.0 else 0.0
 
     def _primary_angle(self, angles: PoseAngles) -> Optional[float]:
-        if self.exercise == "squat":
-            candidates = [v for v in (angles.left_knee, angles.right_knee) if v is not None]
-        elif self.exercise == "pushup":
-            # Front-facing robustness: for pushups, prefer the minimum elbow angle (the arm that bends more)
-            # instead of averaging both. This makes transitions easier to detect even with partial occlusions.
-            elbows = [v for v in (angles.left_elbow, angles.right_elbow) if v is not None]
-            if elbows:
-                # Use min to reflect the deepest flexion
-                return float(min(elbows))
-            candidates = []
-        else:  # crunch (front-facing): prefer hip angles; fallback to shoulder-hip alignment
-            hip_candidates = [v for v in (angles.left_hip, angles.right_hip) if v is not None]
-            if hip_candidates:
-                candidates = hip_candidates
-            else:
-                candidates = [v for v in (angles.shoulder_hip_alignment,) if v is not None]
-        if not candidates:
-            return None
-        return float(sum(candidates) / len(candidates))
+        getter, use_min, fallback = self._primary_spec
+        a, b = getter(angles)
+        if a is None:
+            value = b
+        elif b is None:
+            value = a
+        else:
+            value = min(a, b) if use_min else (a + b) / 2.0
+        if value is None and fallback is not None:
+            value = getattr(angles, fallback)
+        return None if value is None else float(value)
 
     def _primary_angle_smoothed(self, angles: PoseAngles) -> Optional[float]:
         val = self._primary_angle(angles)
         if val is None:
             return None
-        self._angle_window.append(float(val))
-        return float(sum(self._angle_window) / max(1, len(self._angle_window)))
+        return self._angle_window.push(float(val))
 
-    def _update_reps(self, angles: PoseAngles) -> None:
-        angle_value = self._primary_angle_smoothed(angles)
+    def _update_reps(self, angle_value: Optional[float]) -> None:
         if angle_value is None:
             return
-        thresholds = self._thresholds.get(self.exercise, self._thresholds["squat"])
-        down = thresholds["down"]
-        up = thresholds["up"]
-        hyster = float(getattr(self.settings, "pose_rep_hysteresis_deg", 8.0))
-        need_frames = max(1, int(getattr(self.settings, "pose_rep_confirm_frames", 2)))
+        down, up = self._down_up
+        hyster = self._hyster
+        need_frames = self._need_frames
         if self.phase == "up":
             condition = angle_value <= (down + hyster)
             if condition:
@@ -518,85 +1235,50 @@ class PoseEstimator:
             else:
                 self._phase_condition_frames = 0
 
-    def _feedback_for_angles(self, angles: PoseAngles, quality: float) -> Tuple[str, str]:
-        angle_value = self._primary_angle_smoothed(angles)
+    def _feedback_for_angles(self, angles: PoseAngles, angle_value: Optional[float], quality: float) -> Tuple[str, str]:
         if angle_value is None:
-            return "no_skeleton", "No se detecta el cuerpo"
+            return _NO_SKELETON_FEEDBACK
 
-        thresholds = self._thresholds.get(self.exercise, self._thresholds["squat"])
-        down = thresholds["down"]
-        up = thresholds["up"]
+        down, up = self._down_up
         margin = max(5.0, (up - down) * 0.1)
+        target = up if self.phase == "up" else down
 
-        # Part-aware feedback: choose the most problematic part and craft the message
+        # Part-aware feedback: the most problematic part (red before yellow, in priority order)
         parts = self._compute_part_colors(angles)
-        def worst(parts_map: Dict[str, str], order: list[str]) -> Optional[str]:
-            # Priority: torso > left/right part
-            for severity in ("red", "yellow"):
-                for key in order:
-                    if parts_map.get(key) == severity:
-                        return key
-            return None
-        # Heuristics per exercise
-        if self.exercise == "squat":
-            target = up if self.phase == "up" else down
-            key = worst(parts, ["torso", "left_leg", "right_leg"])
-            if key == "torso":
-                return "straight_back", "Mantén la espalda recta"
-            if key in ("left_leg", "right_leg"):
-                side = "izquierda" if key == "left_leg" else "derecha"
-                if angle_value > target:  # le falta flexión al bajar
-                    return "go_lower_" + side, f"Baja más con la rodilla {side}"
-                else:
-                    return "extend_" + side, f"Extiende más la rodilla {side}"
-        elif self.exercise == "pushup":
-            target = up if self.phase == "up" else down
-            key = worst(parts, ["left_arm", "right_arm", "torso"])
-            if key in ("left_arm", "right_arm"):
-                side = "izquierdo" if key == "left_arm" else "derecho"
-                if angle_value > target:
-                    return "go_lower_" + side, f"Flexiona más el codo {side}"
-                else:
-                    return "extend_" + side, f"Extiende más el codo {side}"
-            if key == "torso":
-                return "brace_core", "Activa el core; evita arquear el torso"
-        elif self.exercise == "crunch":
-            target = up if self.phase == "up" else down
-            key = worst(parts, ["torso", "left_leg", "right_leg"])  # torso refleja flexión del tronco
-            if key == "torso":
-                if angle_value < target - margin:
-                    return "protect_neck", "No cargues el cuello"
-                return "go_higher", "Activa el abdomen y sube"
+        order = _FEEDBACK_PART_PRIORITY.get(self.exercise, ())
+        key = next((k for severity in ("red", "yellow") for k in order if parts.get(k) == severity), None)
+        if key is not None:
+            if self.exercise == "crunch":
+                sign = -1 if angle_value < target - margin else 1
+            else:
+                sign = 1 if angle_value > target else -1  # +1: le falta flexión
+            hit = _PART_FEEDBACK.get((self.exercise, key, sign))
+            if hit is not None:
+                return hit
 
         # Fallback genérico si no se detecta parte dominante
-        if self.exercise == "squat":
+        if self.exercise == "crunch":
+            if angle_value < down - margin:
+                return _PART_FEEDBACK[("crunch", "torso", -1)]
             if angle_value > up - margin:
-                return "go_lower", "Baja más la cadera"
-            if angle_value < down + margin:
-                return "control_up", "Controla el ascenso"
-        elif self.exercise == "pushup":
+                return _PART_FEEDBACK[("crunch", "torso", 1)]
+        elif self.exercise in _GENERIC_FEEDBACK:
+            too_high, too_low = _GENERIC_FEEDBACK[self.exercise]
             if angle_value > up - margin:
-                return "go_lower", "Flexiona más los codos"
+                return too_high
             if angle_value < down + margin:
-                return "control_up", "Sube con control"
-        elif self.exercise == "crunch":
-            if angle_value < down - margin:
-                return "protect_neck", "No cargues el cuello"
-            if angle_value > up - margin:
-                return "go_higher", "Activa el abdomen y sube"
+                return too_low
 
         if quality >= 85:
-            return "excellent", "Excelente técnica"
+            return _QUALITY_FEEDBACK[0]
         if quality >= 65:
-            return "good", "Buen ritmo"
-        return "keep_trying", "Sigue así, estabiliza el movimiento"
+            return _QUALITY_FEEDBACK[1]
+        return _QUALITY_FEEDBACK[2]
 
-    def _mock_frame(self) -> Tuple[List[PoseJoint], PoseAngles, Optional[np.ndarray]]:
+    def _mock_frame(self) -> Tuple[PoseJointsSoA, PoseAngles, Optional[np.ndarray]]:
         self._mock_progress = (self._mock_progress + 0.12) % (2 * math.pi)
         depth = (math.sin(self._mock_progress) + 1) / 2  # 0..1
-        thresholds = self._thresholds.get(self.exercise, self._thresholds["squat"])
-        up = thresholds["up"]
-        down = thresholds["down"]
+        down, up = self._down_up
         angle_value = up - (up - down) * depth
 
         left_elbow = right_elbow = 165.0
@@ -622,20 +1304,7 @@ class PoseEstimator:
             torso_forward = 15.0 + depth * 8.0
             shoulder_alignment = 140.0 - depth * 25.0
 
-        joints = [
-            PoseJoint("left_shoulder", 0.45, 0.35, -0.1, 0.9),
-            PoseJoint("right_shoulder", 0.55, 0.35, -0.1, 0.9),
-            PoseJoint("left_hip", 0.47, 0.55, -0.1, 0.9),
-            PoseJoint("right_hip", 0.53, 0.55, -0.1, 0.9),
-            PoseJoint("left_knee", 0.47, 0.75, -0.1, 0.9),
-            PoseJoint("right_knee", 0.53, 0.75, -0.1, 0.9),
-            PoseJoint("left_elbow", 0.42, 0.45, -0.1, 0.9),
-            PoseJoint("right_elbow", 0.58, 0.45, -0.1, 0.9),
-            PoseJoint("left_wrist", 0.40, 0.52, -0.1, 0.9),
-            PoseJoint("right_wrist", 0.60, 0.52, -0.1, 0.9),
-            PoseJoint("left_ankle", 0.47, 0.92, -0.1, 0.9),
-            PoseJoint("right_ankle", 0.53, 0.92, -0.1, 0.9),
-        ]
+        joints = _MOCK_JOINTS
 
         angles = PoseAngles(
             left_elbow=left_elbow,
@@ -653,8 +1322,12 @@ class PoseEstimator:
     def _generate_mock_frame(self, angle_value: float, depth: float) -> Optional[np.ndarray]:
         if cv2 is None:
             return None
-        height, width = 1280, 720
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        # Reused buffer: the fill below overwrites every pixel, so no per-call zeroed allocation.
+        # The HUD cache still re-encodes because each mock frame comes with a new angles object.
+        frame = self._mock_frame_buf
+        if frame is None:
+            frame = self._mock_frame_buf = np.empty((1280, 720, 3), dtype=np.uint8)
+        height, width = frame.shape[:2]
         gradient = int(60 + depth * 140)
         frame[:, :] = (25, 25 + gradient, 40 + gradient)
         center_x = width // 2
@@ -684,151 +1357,207 @@ class PoseEstimator:
             return cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
         return frame
 
-    def _draw_skeleton(self, frame: np.ndarray, joints: List[PoseJoint], quality: float, angles: PoseAngles) -> np.ndarray:
+    def _draw_skeleton(self, frame: np.ndarray, joints: PoseJointsSoA, part_colors: Dict[str, str]) -> np.ndarray:
+        """Draw the skeleton coloured by per-part status levels (see ``_compute_part_colors``)."""
         if cv2 is None or not joints:
             return frame
         height, width = frame.shape[:2]
-        joint_map = {j.name: j for j in joints}
-        # Compute per-part status colors (green/yellow/red) based on angle deviations
-        part_colors = self._compute_part_colors(angles)
-        def color_for(part: str) -> tuple[int, int, int]:
-            level = part_colors.get(part, "green")
-            if level == "red":
-                return (0, 0, 255)
-            if level == "yellow":
-                return (0, 215, 255)
-            return (0, 200, 0)
-        thickness = max(2, width // 240)
-        radius = max(3, width // 180)
-        # Map each connection to a part for coloring
-        connections = [
-            ("left_ankle", "left_knee", "left_leg"),
-            ("left_knee", "left_hip", "left_leg"),
-            ("left_hip", "left_shoulder", "torso"),
-            ("left_shoulder", "left_elbow", "left_arm"),
-            ("left_elbow", "left_wrist", "left_arm"),
-            ("right_ankle", "right_knee", "right_leg"),
-            ("right_knee", "right_hip", "right_leg"),
-            ("right_hip", "right_shoulder", "torso"),
-            ("right_shoulder", "right_elbow", "right_arm"),
-            ("right_elbow", "right_wrist", "right_arm"),
-            ("left_shoulder", "right_shoulder", "torso"),
-            ("left_hip", "right_hip", "torso"),
-        ]
-
-        def to_pixel(j: PoseJoint) -> Tuple[int, int]:
-            return int(j.x * width), int(j.y * height)
-
-        for a, b, part in connections:
-            ja = joint_map.get(a)
-            jb = joint_map.get(b)
-            if ja and jb and ja.score > 0.2 and jb.score > 0.2:
-                cv2.line(frame, to_pixel(ja), to_pixel(jb), color_for(part), thickness, cv2.LINE_AA)
-        for joint in joints:
-            if joint.score <= 0.2:
-                continue
-            # Color joint by its closest part
-            if joint.name.startswith("left_") and any(x in joint.name for x in ("knee","ankle","hip")):
-                jc = color_for("left_leg")
-            elif joint.name.startswith("right_") and any(x in joint.name for x in ("knee","ankle","hip")):
-                jc = color_for("right_leg")
-            elif joint.name.startswith("left_") and any(x in joint.name for x in ("elbow","wrist","shoulder")):
-                jc = color_for("left_arm")
-            elif joint.name.startswith("right_") and any(x in joint.name for x in ("elbow","wrist","shoulder")):
-                jc = color_for("right_arm")
+        # BGR per part resolved once per call (5 lookups) instead of once per edge/joint
+        part_bgr = {part: _LEVEL_BGR[level] for part, level in part_colors.items()}
+        green = _LEVEL_BGR["green"]
+        # Sized by the long side so a rotated (portrait) HUD keeps the same stroke widths
+        long_side = max(height, width)
+        thickness = max(2, long_side // 240)
+        radius = max(3, long_side // 180)
+        idx_a, idx_b, line_parts, joint_parts = _skeleton_layout(joints.names)
+        # One vectorized pixel conversion (int() truncation as before) and visibility mask
+        xy = _joint_pixels(joints, width, height)
+        visible = joints.scores > 0.2
+        drawn = visible[idx_a] & visible[idx_b]
+        segments = np.stack((xy[idx_a], xy[idx_b]), axis=1)  # (edges, 2, 2) endpoint pairs
+
+        # One polylines call per run of same-colour edges (a single call when all parts are green)
+        # instead of one cv2.line per edge; runs keep the edge order, so overlaps blend as before
+        runs: List[Tuple[Tuple[int, int, int], List[np.ndarray]]] = []
+        for i in np.flatnonzero(drawn).tolist():
+            color = part_bgr.get(line_parts[i], green)
+            segment = segments[i]
+            if runs and runs[-1][0] == color:
+                runs[-1][1].append(segment)
             else:
-                jc = color_for("torso")
-            cv2.circle(frame, to_pixel(joint), radius, jc, thickness=-1, lineType=cv2.LINE_AA)
+                runs.append((color, [segment]))
+        for color, segs in runs:
+            cv2.polylines(frame, segs, False, color, thickness, cv2.LINE_AA)
+        pixels = xy.tolist()
+        for i in np.flatnonzero(visible).tolist():
+            cv2.circle(frame, pixels[i], radius, part_bgr.get(joint_parts[i], green), thickness=-1, lineType=cv2.LINE_AA)
         return frame
 
-    def _encode_frame(self, frame: Optional[np.ndarray], joints: List[PoseJoint], quality: float, angles: PoseAngles) -> Optional[str]:
-        if frame is None or cv2 is None:
+    def _encode_frame(self, frame: Optional[np.ndarray], joints: PoseJointsSoA, quality: float, angles: PoseAngles) -> Optional[str]:
+        """Encode the HUD JPEG and return it base64-encoded when HUD_FRAME_INLINE is on.
+
+        The raw JPEG is always kept for ``get_hud_jpeg`` (served by ``GET /posture/frame``).
+        """
+        if self._encode_hud_jpeg(frame, joints, quality, angles) is None:
+            return None
+        if not self.settings.hud_frame_inline:
             return None
-        if getattr(self.settings, "hud_disable", False):
+        with self._hud_lock:
+            if self._hud_b64 is None and self._hud_jpeg is not None:
+                self._hud_b64 = base64.b64encode(self._hud_jpeg).decode("ascii")
+            return self._hud_b64
+
+    def _encode_hud_jpeg(self, frame: Optional[np.ndarray], joints: PoseJointsSoA, quality: float, angles: PoseAngles) -> Optional[bytes]:
+        """Return the JPEG for this frame's HUD; with the background encoder, the latest finished one."""
+        if cv2 is None or getattr(self.settings, "hud_disable", False):
             return None
-        frame_to_encode = frame.copy()
-        frame_to_encode = self._draw_skeleton(frame_to_encode, joints, quality, angles)
-        rotate = int(getattr(self.settings, "hud_frame_rotate", 0))
-        frame_to_encode = self._apply_rotation(frame_to_encode, rotate)
-        h, w = frame_to_encode.shape[:2]
+        with self._hud_lock:
+            last_frame, last_angles, last_sig, last_key, last_jpeg = (
+                self._hud_frame, self._hud_angles, self._hud_sig, self._hud_key, self._hud_jpeg
+            )
+        if frame is None:
+            # No new image this tick (capture stall / skipped decode): keep showing the last one
+            return last_jpeg
+        # Same image with the same overlay inputs (skipped/static frame): reuse the encoded JPEG
+        sig = (int(quality), self.exercise, self.phase)
+        if frame is last_frame and angles is last_angles and sig == last_sig:
+            return last_jpeg
+        now = time.monotonic()
+        idle_timeout = float(getattr(self.settings, "hud_idle_timeout_s", 0.0))
+        if idle_timeout > 0 and now - self._hud_read_ts > idle_timeout:
+            # Nobody has fetched a HUD frame lately (e.g. only the session recorder is sampling)
+            return last_jpeg
+        if self._hud_fps_target > 0 and now - self._last_hud_ts < 1.0 / self._hud_fps_target:
+            return last_jpeg
+        busy = self._hud_future is not None and not self._hud_future.done()
+        if busy:
+            # Encoder still on the previous frame: drop this one rather than queue behind it
+            return last_jpeg
+        h, w = frame.shape[:2]
         target_long_side = int(getattr(self.settings, "hud_target_long_side", 960))
         scale = target_long_side / float(max(h, w))
+        out_w, out_h = (int(w * scale), int(h * scale)) if scale < 1.0 else (w, h)
+        rotate = int(getattr(self.settings, "hud_frame_rotate", 0)) % 360
+        if rotate in (90, 270):
+            out_w, out_h = out_h, out_w
+        # The image is rotated before drawing: rotate the 13 joints instead of the drawn frame
+        joints = _rotate_joints(joints, rotate)
+        # New objects but the same picture and overlay (still camera, athlete holding a pose, or
+        # sub-pixel joint jitter): compare a sparse pixel sample plus what would actually be drawn
+        key = self._hud_content_key(frame, joints, angles, sig, out_w, out_h)
+        if key == last_key and last_jpeg is not None:
+            with self._hud_lock:
+                self._hud_frame, self._hud_angles = frame, angles
+            return last_jpeg
+        # Downscale first and draw at the target resolution: the resize allocates the buffer we draw
+        # on, so the full-size copy is only needed when no resize happens (the overlay must not
+        # land on the source frame, it can be re-encoded with other overlay inputs). Either way the
+        # encoder gets its own buffer, so the source frame may be reused right after this returns.
         if scale < 1.0:
-            frame_to_encode = cv2.resize(
-                frame_to_encode,
-                (int(w * scale), int(h * scale)),
-                interpolation=cv2.INTER_AREA,
-            )
+            # INTER_LINEAR: the HUD is a live preview, and INTER_AREA gets ~10x slower on
+            # non-integer factors (e.g. 1080p -> 720 long side)
+            frame_to_encode = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_LINEAR)
+            frame_to_encode = self._apply_rotation(frame_to_encode, rotate)
+        elif rotate in (90, 180, 270):
+            # The rotation writes a new buffer, so it doubles as the copy
+            frame_to_encode = self._apply_rotation(frame, rotate)
+        else:
+            frame_to_encode = frame.copy()
+        # Colours depend on exercise/phase, so resolve them here rather than on the encoder thread
+        part_colors = self._compute_part_colors(angles)
+        inputs = (frame, angles, sig, key)
+        self._last_hud_ts = now
+        if self._hud_executor is not None:
+            self._hud_future = self._hud_executor.submit(self._render_hud, frame_to_encode, joints, part_colors, inputs)
+            return last_jpeg
+        return self._render_hud(frame_to_encode, joints, part_colors, inputs)
+
+    def _render_hud(
+        self, frame_to_encode: np.ndarray, joints: PoseJointsSoA, part_colors: Dict[str, str], inputs: tuple
+    ) -> Optional[bytes]:
+        """Draw and JPEG-encode an owned (already rotated) HUD buffer, then publish it with its inputs."""
+        frame_to_encode = self._draw_skeleton(frame_to_encode, joints, part_colors)
         jpeg_q = max(30, min(95, int(getattr(self.settings, "hud_jpeg_quality", 70))))
-        success, buffer = cv2.imencode(".jpg", frame_to_encode, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_q])
+        success, buffer = cv2.imencode(".jpg", frame_to_encode, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_q, *_HUD_JPEG_FLAGS])
         if not success:
             return None
-        return base64.b64encode(buffer).decode("ascii")
+        jpeg = buffer.tobytes()
+        with self._hud_lock:
+            # Holding the frame reference keeps its identity unique while it is cached
+            self._hud_frame, self._hud_angles, self._hud_sig, self._hud_key = inputs
+            self._hud_jpeg = jpeg
+            self._hud_b64 = None  # base64 is derived lazily, only when sent inline
+            self._hud_frame_id += 1
+        return jpeg
+
+    def _hud_content_key(
+        self, frame: np.ndarray, joints: PoseJointsSoA, angles: PoseAngles, sig: tuple, width: int, height: int
+    ) -> tuple:
+        """Fingerprint of one HUD image: source pixel sample plus the overlay as drawn at ``width`` x ``height``.
+
+        Joints are compared as the integer pixels ``_draw_skeleton`` uses, so moves below one HUD pixel match.
+        """
+        stride = _HUD_FINGERPRINT_STRIDE
+        overlay = b""
+        if len(joints):
+            overlay = _joint_pixels(joints, width, height).tobytes() + (joints.scores > 0.2).tobytes()
+        colors = tuple(self._compute_part_colors(angles).values())
+        return sig, frame.shape, (width, height), frame[::stride, ::stride].tobytes(), joints.names, overlay, colors
+
+    def mark_hud_read(self) -> None:
+        """Record that a client is consuming HUD frames (keeps the encoder running)."""
+        self._hud_read_ts = time.monotonic()
+
+    def get_hud_jpeg(self) -> Tuple[int, Optional[bytes]]:
+        """Return (frame_id, JPEG bytes) of the last encoded HUD frame."""
+        self.mark_hud_read()
+        with self._hud_lock:
+            return self._hud_frame_id, self._hud_jpeg
 
     def _compute_part_colors(self, angles: PoseAngles) -> Dict[str, str]:
         """Return per-part color levels {'left_arm','right_arm','left_leg','right_leg','torso'}.
         Levels: 'green' | 'yellow' | 'red', derived from deviation vs target thresholds.
-        """
-        thresholds = self._thresholds.get(self.exercise, self._thresholds["squat"])
-        down = thresholds["down"]
-        up = thresholds["up"]
-        target_current = up if self.phase == "up" else down
-        # Range-based margin scales with exercise
-        range_span = max(10.0, abs(up - down))
-        margin = max(5.0, range_span * 0.10)
-
-        def level_for_error(err: float) -> str:
-            if err <= margin:
-                return "green"
-            if err <= 2 * margin:
-                return "yellow"
-            return "red"
-
-        # Compute per-part errors
-        parts: Dict[str, float] = {}
-        # Legs: only relevant for squat; use individual knees vs current target
-        if self.exercise == "squat":
-            if angles.left_knee is not None:
-                parts["left_leg"] = abs(float(angles.left_knee) - target_current)
-            if angles.right_knee is not None:
-                parts["right_leg"] = abs(float(angles.right_knee) - target_current)
-        # Arms: push-up primary is elbow; in otros ejercicios, mantén verde salvo datos presentes
-        if angles.left_elbow is not None:
-            parts.setdefault("left_arm", abs(float(angles.left_elbow) - target_current) if self.exercise == "pushup" else 0.0)
-        if angles.right_elbow is not None:
-            parts.setdefault("right_arm", abs(float(angles.right_elbow) - target_current) if self.exercise == "pushup" else 0.0)
-        # Torso: penaliza inclinación excesiva (squat) o falta de flexión (crunch)
-        torso_err = 0.0
-        if self.exercise == "squat":
-            tf = float(angles.torso_forward or 0.0)
-            torso_err = max(0.0, tf - 25.0)  # >25° se considera excesivo
-        elif self.exercise == "crunch":
-            # Usa alineación hombro-cadera como indicador de flexión del tronco
-            if angles.shoulder_hip_alignment is not None:
-                torso_err = abs(float(angles.shoulder_hip_alignment) - target_current)
-        elif self.exercise == "pushup":
-            # Torso caído arqueado: torsión pequeña implica peor (usar inverso)
-            tf = float(angles.torso_forward or 0.0)
-            torso_err = max(0.0, 10.0 - tf)
-        parts["torso"] = parts.get("torso", 0.0) + torso_err
-
-        # Default greens for missing parts
-        for k in ("left_arm", "right_arm", "left_leg", "right_leg", "torso"):
-            parts.setdefault(k, 0.0)
 
-        return {k: level_for_error(v) for k, v in parts.items()}
-
-    def get_fps_avg(self) -> float:
-        if not self._fps_window:
-            return 0.0
-        return sum(self._fps_window) / len(self._fps_window)
-
-    def get_latency_samples_count(self) -> int:
-        return len(self._latencies)
+        Feedback and HUD drawing both ask for the same frame's colors; the result is
+        memoized on (angles object, exercise, phase) and must not be mutated.
+        """
+        cached = self._parts_cache
+        if cached is not None and cached[0] is angles and cached[1] == self.exercise and cached[2] == self.phase:
+            return cached[3]
+        colors = self._part_colors_uncached(angles)
+        # Holding the angles reference keeps its identity unique while cached
+        self._parts_cache = (angles, self.exercise, self.phase, colors)
+        return colors
+
+    def _part_colors_uncached(self, angles: PoseAngles) -> Dict[str, str]:
+        # Thresholds and margin are resolved on exercise change; only the phase picks the target here
+        target = self._down_up[1] if self.phase == "up" else self._down_up[0]
+        # Angles quantized to 0.1 deg so near-identical frames (athlete holding still) hit the LRU cache
+        return _part_colors_for(
+            self.exercise,
+            target,
+            self._part_margin,
+            _q1(angles.left_knee),
+            _q1(angles.right_knee),
+            _q1(angles.left_elbow),
+            _q1(angles.right_elbow),
+            _q1(angles.torso_forward),
+            _q1(angles.shoulder_hip_alignment),
+        )
 
     # --- context -------------------------------------------------------
 
     def __del__(self) -> None:  # pragma: no cover
+        try:
+            if self._capture is not None:
+                self._capture.stop()
+        except Exception:
+            pass
+        try:
+            if self._hud_executor is not None:
+                self._hud_executor.shutdown(wait=False)
+        except Exception:
+            pass
         try:
             if self._cap:
                 self._cap.release()
@@ -11,7 +11,7 @@ import unicodedata
 from loguru import logger
 
 from app.core.config import get_settings
-from app.training.datasets import load_voice_commands, register_voice_synonym
+from app.training.datasets import VoiceCommandIndex, canonicalize_utterance, load_voice_commands, register_voice_synonym
 
 try:  # Optional dependency
     import vosk  # type: ignore
@@ -19,7 +19,7 @@ except Exception:  # pragma: no cover
     vosk = None  # type: ignore
 
 def _normalize_key(value: str) -> str:
-    base = unicodedata.normalize("NFKD", value.strip().lower())
+    base = unicodedata.normalize("NFKD", canonicalize_utterance(value))
     return "".join(ch for ch in base if not unicodedata.combining(ch))
 
 
@@ -31,9 +31,10 @@ _DEFAULT_COMMANDS: Dict[str, str] = {
 }
 
 _COMMANDS_CACHE: Dict[str, str] = {}
+_COMMANDS_INDEX: Optional[VoiceCommandIndex] = None
 
 def _load_commands() -> Dict[str, str]:
-    global _COMMANDS_CACHE
+    global _COMMANDS_CACHE, _COMMANDS_INDEX
     if not _COMMANDS_CACHE:
         data = load_voice_commands()
         mapping: Dict[str, str] = {}
@@ -42,9 +43,15 @@ def _load_commands() -> Dict[str, str]:
         for key, value in data.items():
             mapping[_normalize_key(key)] = value
         _COMMANDS_CACHE = mapping
+        _COMMANDS_INDEX = VoiceCommandIndex(mapping)
     return _COMMANDS_CACHE
 
 
+def _commands_index() -> VoiceCommandIndex:
+    mapping = _load_commands()
+    return _COMMANDS_INDEX if _COMMANDS_INDEX is not None else VoiceCommandIndex(mapping)
+
+
 def refresh_commands_cache() -> None:
     global _COMMANDS_CACHE
     _COMMANDS_CACHE = {}
@@ -142,12 +149,5 @@ def map_utterance_to_intent(utterance: str) -> Optional[str]:
     """Map a plaintext utterance to a known intent using synonym mapping."""
     if not utterance:
         return None
-    mapping = _load_commands()
-    normalized = _normalize_key(utterance)
-    if normalized in mapping:
-        return mapping[normalized]
-    # Fallback: allow substring match when the utterance contains the keyword
-    for key, intent in mapping.items():
-        if key and key in normalized:
-            return intent
-    return None
+    # Exact match first, then the longest known keyword contained in the utterance
+    return _commands_index().best_match(_normalize_key(utterance))
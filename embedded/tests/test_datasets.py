@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from app.training import datasets
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, "POSE_DIR", tmp_path / "pose")
+    monkeypatch.setattr(datasets, "VOICE_DIR", tmp_path / "voice")
+    monkeypatch.setattr(datasets, "COMMANDS_FILE", tmp_path / "voice_commands.json")
+    yield tmp_path
+    datasets.flush_training_writes()
+
+
+def _read_lines(path):
+    datasets.flush_training_writes()
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_save_pose_sample_roundtrip(data_dirs):
+    joints = [{"name": "left_knee", "x": 0.5, "y": 0.75, "score": 0.9}]
+    path, stamp = datasets.save_pose_sample("Sentadilla Baja", joints, {"left_knee": 95.0}, {"notes": "ñ"})
+    assert path.parent == data_dirs / "pose"
+    assert path.suffix == ".jsonl"
+    (payload,) = _read_lines(path)
+    assert payload["label"] == "Sentadilla Baja"
+    assert payload["timestamp_utc"] == stamp
+    assert payload["joints"]["format"] == "soa_q16"
+    assert payload["joints"]["xy"] == [[4096, 6143]]
+    (joint,) = datasets.joints_from_soa(payload["joints"])
+    assert joint["name"] == "left_knee"
+    assert (joint["x"], joint["y"], joint["score"]) == pytest.approx((0.5, 0.75, 0.9), abs=1e-4)
+    assert payload["angles"] == {"left_knee": 95.0}
+    assert payload["metadata"] == {"notes": "ñ"}
+
+
+def test_joints_soa_accepts_columns_and_legacy_lists():
+    soa = datasets.joints_to_soa({"names": ["nose"], "xy": [(0.1, 0.2)], "score": [1.0]})
+    assert soa["xy"].dtype == "int16" and soa["xy"].shape == (1, 2)
+    assert datasets.joints_from_soa(soa)[0]["x"] == pytest.approx(0.1, abs=1e-4)
+    v1 = {"format": "soa_v1", "names": ["nose"], "xy": [[0.1, 0.2]], "score": [1.0]}
+    assert datasets.joints_from_soa(v1)[0]["y"] == pytest.approx(0.2)
+    old_scale = {"format": "soa_q16", "scale": 32767, "names": ["nose"], "xy": [[16384, 24575]], "score": [32767]}
+    assert datasets.joints_from_soa(old_scale)[0]["y"] == pytest.approx(0.75, abs=1e-4)
+    legacy = [{"name": "nose", "x": 0.1, "y": 0.2, "score": 1.0}]
+    assert datasets.joints_from_soa(legacy) == legacy
+
+
+def test_joints_soa_keeps_off_frame_landmarks():
+    joints = [{"name": "left_ankle", "x": -0.35, "y": 1.2, "score": 0.4}, {"name": "nose", "x": 3.5, "y": -2.0, "score": 1.0}]
+    restored = datasets.joints_from_soa(datasets.joints_to_soa(joints))
+    for original, joint in zip(joints, restored):
+        assert (joint["x"], joint["y"], joint["score"]) == pytest.approx(
+            (original["x"], original["y"], original["score"]), abs=1e-4
+        )
+
+
+def test_save_voice_samples_append_to_one_log(data_dirs):
+    first = datasets.save_voice_sample("  iniciar  ", "start")
+    second = datasets.save_voice_sample("alto", "stop")
+    assert first.path == second.path  # one shared daily log; the timestamp tells the samples apart
+    payloads = _read_lines(first.path)
+    assert [(p["transcript"], p["intent"]) for p in payloads] == [("iniciar", "start"), ("alto", "stop")]
+    assert [p["timestamp_utc"] for p in payloads] == [first.timestamp_utc, second.timestamp_utc]
+
+
+def test_legacy_flag_writes_one_file_per_sample(data_dirs, monkeypatch):
+    monkeypatch.setattr(datasets, "_LEGACY_FILES", True)
+    path = datasets.save_pose_sample("Sentadilla Baja", [], {}).path
+    assert path.name.endswith("_sentadilla_baja.json")
+    datasets.flush_training_writes()
+    text = path.read_text(encoding="utf-8")
+    assert text.count("\n") == 1  # compact unless TRAINING_PRETTY=1
+    assert json.loads(text)["label"] == "Sentadilla Baja"
+
+
+def test_register_voice_synonym_persists(data_dirs):
+    datasets.register_voice_synonym("  Arrancar   YA ", "start")
+    assert datasets.load_voice_commands() == {"arrancar ya": "start"}
+
+
+def test_load_voice_commands_tracks_file_changes(data_dirs):
+    datasets.save_voice_commands({"vamos": "start"})
+    first = datasets.load_voice_commands()
+    first["mutated"] = "stop"  # callers get a copy, not the cached dict
+    assert datasets.load_voice_commands() == {"vamos": "start"}
+    path = data_dirs / "voice_commands.json"
+    path.write_text(json.dumps({"alto": "stop"}), encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert datasets.load_voice_commands() == {"alto": "stop"}
+
+
+def test_register_voice_synonyms_batches_writes(data_dirs, monkeypatch):
+    writes = []
+    original = datasets.save_voice_commands
+    monkeypatch.setattr(datasets, "save_voice_commands", lambda m: (writes.append(dict(m)), original(m)))
+    assert datasets.register_voice_synonyms([("Dale", "start"), ("alto", "stop")]) == 2
+    assert datasets.register_voice_synonyms([("dale", "start")]) == 0
+    assert len(writes) == 1
+    assert datasets.load_voice_commands() == {"dale": "start", "alto": "stop"}
+
+
+def test_write_batch_joins_lines_per_log(data_dirs):
+    calls = []
+    append = lambda path, data: calls.append((path, data))  # noqa: E731
+    a, b = data_dirs / "a.jsonl", data_dirs / "b.jsonl"
+    datasets._write_batch([(append, a, b"1\n"), (append, a, b"2\n"), (append, b, b"3\n"), (append, a, b"4\n")])
+    assert calls == [(a, b"1\n2\n"), (b, b"3\n"), (a, b"4\n")]
+
+
+def test_full_write_queue_keeps_submission_order(data_dirs, monkeypatch):
+    import queue
+    import time
+
+    monkeypatch.setattr(datasets, "_WRITE_QUEUE", queue.Queue(maxsize=1))
+    written = []
+
+    def slow_append(path, data):
+        time.sleep(0.002)
+        written.append(data)
+
+    for i in range(20):
+        datasets._submit_write(slow_append, data_dirs / "a.jsonl", b"%d\n" % i)
+    datasets.flush_training_writes()
+    assert b"".join(written) == b"".join(b"%d\n" % i for i in range(20))
+
+
+def test_saves_after_shutdown_are_written_inline(data_dirs, monkeypatch):
+    monkeypatch.setattr(datasets, "_WRITES_CLOSED", False)
+    datasets.save_voice_sample("iniciar", "start")
+    datasets._shutdown_training_writes()
+    assert datasets._WRITE_THREAD is None
+    late = datasets.save_voice_sample("alto", "stop")
+    assert datasets._WRITE_THREAD is None  # no writer restarted after shutdown
+    payloads = [json.loads(line) for line in late.path.read_text(encoding="utf-8").splitlines()]
+    assert [p["intent"] for p in payloads] == ["start", "stop"]
+
+
+def test_last_sample_of_burst_is_flushed_without_closing(data_dirs):
+    datasets.save_voice_sample("iniciar", "start")
+    ref = datasets.save_voice_sample("alto", "stop")
+    datasets._WRITE_QUEUE.join()  # drained, but the log is still open
+    lines = ref.path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["intent"] for line in lines] == ["start", "stop"]
+    datasets.flush_training_writes()
+    assert [p["intent"] for p in _read_lines(ref.path)] == ["start", "stop"]
+
+
+def test_timestamp_helpers_match_datetime_formats():
+    from datetime import datetime, timezone
+
+    t, us = datasets._utc_now()
+    dt = datetime(*t[:6], us, tzinfo=timezone.utc)
+    assert datasets._format_ts(t, us) == dt.strftime("%Y%m%dT%H%M%S%fZ")
+    assert datetime.fromisoformat(datasets._format_iso(t, us)) == dt
+
+
+def test_voice_command_index_prefers_exact_then_longest_key():
+    index = datasets.VoiceCommandIndex({"pausa": "pause", "pausa larga": "stop", "siguiente": "next"})
+    assert index.best_match("pausa") == "pause"
+    assert index.best_match("haz una pausa larga ya") == "stop"
+    assert index.best_match("vamos al siguiente") == "next"
+    assert index.best_match("nada") is None
+    assert index.get("pausa larga") == "stop"
+
+
+def test_voice_command_index_rebuilds_on_file_change(data_dirs):
+    datasets.save_voice_commands({"vamos": "start"})
+    first = datasets.get_voice_command_index()
+    assert datasets.get_voice_command_index() is first
+    datasets.register_voice_synonym("alto", "stop")
+    assert datasets.get_voice_command_index().best_match("alto ahi") == "stop"
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from app.core.posture_series import PostureSample, PostureSeries
+from app.metrics_exporter import _collect_voice_stats, _parse_voice_logs, _series_vision_metrics, export_posture
+
+
+def test_posture_series_from_legacy_samples():
+    samples = [
+        PostureSample(t=0.0, angle=120.0, rep_count=0, is_rep=0, latency_ms=40.0, fps=15.0),
+        {"t": 0.2, "angle": None, "rep_count": 1, "is_rep": 1, "latency_ms": 60.0, "fps": 13.0},
+        {"t": None, "angle": 90.0},
+    ]
+    series = PostureSeries.from_samples(samples)
+    assert len(series) == 2
+    fps, p50, p95 = _series_vision_metrics(series)
+    assert fps == 14.0
+    assert p50 == 50.0
+    assert 50.0 <= p95 <= 60.0
+
+
+def test_importing_exporter_skips_vision_stack():
+    code = "import sys, app.metrics_exporter; print('app.vision.pipeline' in sys.modules, 'cv2' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_export_posture_writes_angle_timeline(tmp_path):
+    samples = [
+        {"t": 0.0, "angle": 120.0, "is_rep": 0, "latency_ms": 40.0, "fps": 15.0},
+        {"t": 0.2, "angle": None, "is_rep": 1, "latency_ms": 60.0, "fps": 13.0},
+    ]
+    # Unreachable base_url: session status is best-effort, series metrics still export
+    export_posture("http://127.0.0.1:9", tmp_path, posture_series=samples)
+    lines = (tmp_path / "angulo_tiempo.csv").read_text(encoding="utf-8").splitlines()
+    assert lines == ["t,angulo,is_rep", "0.000,120.000,0", "0.200,,1"]
+    assert (tmp_path / "posture_metrics.json").exists()
+
+
+def test_query_ro_reopens_replaced_database(tmp_path):
+    import os
+    import sqlite3
+
+    from app.metrics_exporter import _query_ro
+
+    def make_db(path, value):
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.execute("INSERT INTO t VALUES (?)", (value,))
+        conn.commit()
+        conn.close()
+
+    db = tmp_path / "smartmirror.db"
+    make_db(db, 1)
+    assert _query_ro(db, "SELECT v FROM t") == [(1,)]
+    make_db(tmp_path / "restored.db", 2)
+    os.replace(tmp_path / "restored.db", db)  # same path, new file (e.g. restored backup)
+    assert _query_ro(db, "SELECT v FROM t") == [(2,)]
+
+
+def test_minute_keys_keep_timestamp_offsets():
+    from datetime import datetime
+
+    from app.metrics_exporter import _minute_from_key, _minute_key
+
+    for ts in ("2025-01-01T10:15:42.5", "2025-01-01T10:15:42+00:00", "2025-01-01T23:59:59-03:00"):
+        dt = datetime.fromisoformat(ts)
+        expected = dt.replace(second=0, microsecond=0)
+        restored = _minute_from_key(_minute_key(dt), dt.tzinfo)
+        assert restored.isoformat() == expected.isoformat()
+    utc, local = datetime.fromisoformat("2025-01-01T13:00:10+00:00"), datetime.fromisoformat("2025-01-01T10:00:50-03:00")
+    assert _minute_key(utc) == _minute_key(local)  # same instant, same bucket
+
+
+def test_parse_voice_logs_pairs_intents(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text(
+        "2025-01-01 10:00:00.000 | INFO | Intent 'start' reconocido (texto='iniciar')\n"
+        "2025-01-01 10:00:00.100 | INFO | unrelated line\n"
+        "2025-01-01 10:00:00.250 | INFO | Intent 'start' ejecutado -> /session/start\n"
+        "2025-01-01 10:00:05.000 | INFO | Intent 'pause' reconocido\n",
+        encoding="utf-8",
+    )
+    recognized, executed, latencies = _parse_voice_logs([log])
+    assert recognized == {"start": 1, "pause": 1}
+    assert executed == {"start": 1}
+    assert latencies["start"] == [250.0]
+
+
+def test_collect_voice_stats_prefers_session_arrays(tmp_path):
+    rec = [{"intent": "next", "timestamp": "2025-01-01T10:00:00"}]
+    exe = [{"intent": "next", "timestamp": "2025-01-01T10:00:00.400000"}]
+    # Missing log file must not matter when the session arrays are present
+    recognized, executed, latencies = _collect_voice_stats(tmp_path / "missing.log", voice_recognized=rec, voice_executed=exe)
+    assert recognized == {"next": 1}
+    assert executed == {"next": 1}
+    assert latencies["next"] == [400.0]
+
+
+def test_generate_all_exports_survives_bad_voice_events(tmp_path):
+    from app.metrics_exporter import generate_all_exports
+
+    posture = [{"t": 0.0, "angle": 120.0, "is_rep": 0, "latency_ms": 40.0, "fps": 15.0}]
+    out_dir = generate_all_exports(
+        base_url="http://127.0.0.1:9",
+        db_path=tmp_path / "missing.db",
+        log_path=tmp_path / "missing.log",
+        out_root=tmp_path / "exports",
+        posture_series=posture,
+        voice_recognized=["not-a-dict"],
+        voice_executed=[],
+    )
+    # The shared voice precompute fails, the other exporters still write their files
+    assert (out_dir / "angulo_tiempo.csv").exists()
+    assert (out_dir / "posture_metrics.json").exists()
+
+
+def test_session_recorder_reads_slotted_pose_angles():
+    from app.core.session_recorder import SessionRecorder
+    from app.vision.pipeline import PoseAngles
+
+    recorder = SessionRecorder(pose_estimator=None)  # type: ignore[arg-type]
+    assert recorder._primary_angle("squat", PoseAngles(left_knee=90.0, right_knee=110.0)) == 100.0
+    assert recorder._primary_angle("crunch", PoseAngles(shoulder_hip_alignment=120.0)) == 120.0
+
+
+def test_session_recorder_keeps_reused_latency_out_of_stats():
+    from app.core.session_recorder import SessionRecorder
+    from app.vision.pipeline import PoseAngles
+
+    results = iter([40.0, None, None, None, 80.0])
+
+    class IdleEstimator:
+        def analyze_frame(self):
+            lat = next(results, None)
+            return SimpleNamespace(exercise="squat", angles=PoseAngles(), rep_count=0, latency_ms=lat, fps=15.0)
+
+    recorder = SessionRecorder(IdleEstimator(), sample_hz=200.0)  # type: ignore[arg-type]
+    recorder.start()
+    deadline = time.time() + 2.0
+    while len(recorder.get_series()) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    recorder.stop()
+    series = recorder.get_series()
+    _, p50, _ = _series_vision_metrics(series)
+    assert p50 == 60.0  # only the two measured frames count
+    assert recorder.get_samples()[1].latency_ms is None
+
+
+def test_session_recorder_logs_first_sampling_failure(monkeypatch):
+    from app.core import session_recorder
+    from app.core.session_recorder import SessionRecorder
+
+    class BrokenEstimator:
+        def analyze_frame(self):
+            raise RuntimeError("boom")
+
+    logged = []
+    monkeypatch.setattr(session_recorder.logger, "exception", lambda msg, *a: logged.append(msg))
+    recorder = SessionRecorder(BrokenEstimator(), sample_hz=200.0)  # type: ignore[arg-type]
+    recorder.start()
+    deadline = time.time() + 2.0
+    while not logged and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    recorder.stop()
+    assert len(logged) == 1  # first failure reported once, later ones only at debug level
+    assert len(recorder.get_series()) == 0
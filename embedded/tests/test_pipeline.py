@@ -0,0 +1,554 @@
+from __future__ import annotations
+
+import math
+import time
+
+import pytest
+
+from app.vision.pipeline import PoseEstimator
+
+
+def _points(**overrides):
+    base = {
+        "left_shoulder": (0.4, 0.3, 0.0, 1.0),
+        "right_shoulder": (0.6, 0.3, 0.0, 1.0),
+        "left_elbow": (0.4, 0.5, 0.0, 1.0),
+        "right_elbow": (0.6, 0.5, 0.0, 1.0),
+        "left_wrist": (0.6, 0.5, 0.0, 1.0),
+        "right_wrist": (0.6, 0.7, 0.0, 1.0),
+        "left_hip": (0.4, 0.6, 0.0, 1.0),
+        "right_hip": (0.6, 0.6, 0.0, 1.0),
+        "left_knee": (0.4, 0.8, 0.0, 1.0),
+        "right_knee": (0.6, 0.8, 0.0, 1.0),
+        "left_ankle": (0.4, 1.0, 0.0, 1.0),
+        "right_ankle": (0.6, 1.0, 0.0, 1.0),
+    }
+    base.update(overrides)
+    return base
+
+
+def test_compute_angles_batch():
+    angles = PoseEstimator()._compute_angles(_points())
+    assert angles.left_elbow == pytest.approx(90.0)
+    assert angles.right_elbow == pytest.approx(180.0)
+    assert angles.left_knee == pytest.approx(180.0)
+    assert angles.shoulder_hip_alignment == pytest.approx(90.0)
+    assert angles.torso_forward == pytest.approx(math.degrees(math.atan2(0.1, 0.3 + 1e-6)))
+
+
+def test_compute_angles_missing_and_degenerate_joints():
+    points = _points(left_wrist=(0.4, 0.5, 0.0, 1.0))  # wrist on top of the elbow
+    del points["right_ankle"]
+    angles = PoseEstimator()._compute_angles(points)
+    assert angles.left_elbow == 0.0
+    assert angles.right_knee is None
+    assert angles.left_knee is not None
+
+
+def test_landmark_array_gathers_key_joints():
+    from types import SimpleNamespace
+
+    from app.vision import pipeline
+
+    points = _points()
+    landmarks = [SimpleNamespace(x=0.0, y=0.0, z=0.0) for _ in range(pipeline._BLAZEPOSE_LANDMARKS)]
+    for name, (x, y, z, score) in points.items():
+        landmarks[pipeline._POSE_LANDMARK_INDEX[name]] = SimpleNamespace(x=x, y=y, z=z, visibility=score)
+    key = PoseEstimator._landmark_array(landmarks)
+    assert key.shape == (len(pipeline._KEY_NAMES), 4)
+    assert key[pipeline._KEY_NAMES.index("left_elbow")].tolist() == [0.4, 0.5, 0.0, 1.0]
+    assert key[pipeline._KEY_NAMES.index("nose")].tolist() == [0.0, 0.0, 0.0, 1.0]  # default visibility
+    assert PoseEstimator()._angles_from_array(key[:, :3]) == PoseEstimator()._compute_angles(points)
+
+
+def test_p2_quantile_tracks_numpy_percentiles():
+    import numpy as np
+
+    from app.vision.pipeline import P2Quantile
+
+    rng = np.random.default_rng(0)
+    data = rng.gamma(4.0, 10.0, size=2000)
+    p50, p95 = P2Quantile(0.5), P2Quantile(0.95)
+    for x in data:
+        p50.add(float(x))
+        p95.add(float(x))
+    assert p50.value() == pytest.approx(np.percentile(data, 50), rel=0.05)
+    assert p95.value() == pytest.approx(np.percentile(data, 95), rel=0.05)
+
+    small = P2Quantile(0.5)
+    for x in (3.0, 1.0, 2.0):
+        small.add(x)
+    assert small.value() == 2.0
+
+
+def test_windowed_quantile_forgets_slow_start():
+    from app.vision.pipeline import WindowedQuantile
+
+    p95 = WindowedQuantile(0.95, 90)
+    for _ in range(90):
+        p95.add(500.0)  # slow warm-up frames
+    assert p95.value() == pytest.approx(500.0)
+    for i in range(90):
+        p95.add(20.0 + (i % 5))
+    assert p95.value() <= 25.0
+
+
+def test_window_percentiles_use_nearest_rank():
+    import numpy as np
+
+    pe = PoseEstimator()
+    assert pe.get_latency_p50_p95_ms(exact=True) == (0.0, 0.0)
+    samples = [float(v) for v in np.random.default_rng(1).permutation(40)]
+    pe._latencies.extend(samples)
+    ordered = sorted(pe._latencies)
+    n = len(ordered)
+    assert pe.get_latency_p50_p95_ms(exact=True) == (ordered[math.ceil(0.5 * n) - 1], ordered[math.ceil(0.95 * n) - 1])
+
+
+def test_rolling_mean_matches_deque_window():
+    from collections import deque
+
+    from app.vision.pipeline import RollingMean
+
+    rolling, window = RollingMean(5), deque(maxlen=5)
+    assert rolling.mean() == 0.0
+    for v in [3.0, 1.5, 8.25, 4.0, 2.0, 9.5, 0.125, 7.0, 6.0, 5.5, 1.0, 2.5]:
+        window.append(v)
+        assert rolling.push(v) == pytest.approx(sum(window) / len(window))
+    assert len(rolling) == 5
+    rolling.clear()
+    assert (len(rolling), rolling.mean()) == (0, 0.0)
+
+
+def test_tflite_pose_adapter_undoes_letterbox(monkeypatch):
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+
+    class FakeInterpreter:
+        def __init__(self, model_path, experimental_delegates=None, num_threads=1):
+            self.tensors = {}
+
+        def allocate_tensors(self):
+            pass
+
+        def get_input_details(self):
+            return [{"index": 0, "dtype": np.float32, "shape": (1, 256, 256, 3), "quantization": (0.0, 0)}]
+
+        def get_output_details(self):
+            return [{"index": 1, "shape": (1, 195), "quantization": (0.0, 0)}]
+
+        def set_tensor(self, index, value):
+            self.tensors[index] = value
+
+        def invoke(self):
+            lm = np.zeros((39, 5), dtype=np.float32)
+            lm[:, 0] = 128.0  # centre of the model input
+            lm[:, 1] = 64.0 + 32.0  # quarter of the letterboxed content (pad_y = 64, content 128 high)
+            lm[:, 3] = 10.0
+            self.tensors[1] = lm.reshape(1, -1)
+
+        def get_tensor(self, index):
+            return self.tensors[index]
+
+    monkeypatch.setattr(pipeline, "TFLiteInterpreter", FakeInterpreter)
+    pose = pipeline._TFLitePose("model.tflite")
+    result = pose.process(np.zeros((360, 720, 3), dtype=np.uint8))
+    landmark = result.pose_landmarks.landmark[pipeline._POSE_LANDMARK_INDEX["left_knee"]]
+    assert landmark.x == pytest.approx(0.5)
+    assert landmark.y == pytest.approx(0.25)
+    assert landmark.visibility > 0.99
+    rows = result.pose_landmarks.array
+    assert rows.shape == (33, 4)
+    assert rows[pipeline._POSE_LANDMARK_INDEX["left_knee"]].tolist() == [landmark.x, landmark.y, landmark.z, landmark.visibility]
+
+    # int8 input: the per-pixel lookup table matches quantizing each value directly
+    quant = {"index": 0, "dtype": np.int8, "shape": (1, 256, 256, 3), "quantization": (1 / 255.0, -128)}
+    monkeypatch.setattr(FakeInterpreter, "get_input_details", lambda self: [quant])
+    pose = pipeline._TFLitePose("model.tflite")
+    rgb = np.arange(256 * 256 * 3, dtype=np.uint32).reshape(256, 256, 3).astype(np.uint8)
+    pose.process(rgb)
+    expected = np.clip(np.rint(rgb / 255.0 / quant["quantization"][0] - 128), -128, 127).astype(np.int8)
+    assert np.array_equal(pose._interp.tensors[0][0], expected)
+
+
+class _FakeGrabCap:
+    """VideoCapture stand-in counting grab()/retrieve() calls."""
+
+    def __init__(self, frames=None, delay=0.0):
+        self.frames = frames
+        self.delay = delay
+        self.grabs = 0
+        self.retrieves = 0
+
+    def grab(self):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.frames is not None and self.grabs >= self.frames:
+            return False
+        self.grabs += 1
+        return True
+
+    def retrieve(self):
+        self.retrieves += 1
+        return True, "f%d" % self.grabs
+
+
+def test_capture_thread_only_grabs_without_demand():
+    from app.vision.pipeline import _CaptureThread
+
+    cap = _FakeGrabCap(frames=3)
+    capture = _CaptureThread(cap)
+    capture.run()  # synchronous: grabs every frame, then flags the failed grab
+    assert capture.failed
+    assert (cap.grabs, cap.retrieves) == (3, 0)
+    assert capture.take(timeout=0.0) is None
+
+
+def test_capture_thread_decodes_only_taken_frames():
+    from app.vision.pipeline import _CaptureThread
+
+    cap = _FakeGrabCap(delay=0.001)
+    capture = _CaptureThread(cap)
+    capture.start()
+    try:
+        frames = [capture.take(timeout=1.0, prefetch=False) for _ in range(3)]
+        time.sleep(0.02)
+    finally:
+        capture.stop()
+    assert all(frames)
+    assert cap.retrieves == 3
+    assert cap.grabs > cap.retrieves
+
+
+def test_static_pose_reuses_feedback_without_kinematics(monkeypatch):
+    pe = PoseEstimator()
+    pe.set_counting_enabled(True)
+    pe.analyze_frame()
+
+    def static_frame():
+        pe._pose_static = True
+        return pe._last_joints, pe._last_angles, None
+
+    monkeypatch.setattr(pe, "_process_frame", static_frame)
+    for _ in range(pe._angle_window.size):
+        first = pe.analyze_frame()  # smoothing window fills with the still pose's angle
+    calls = []
+    monkeypatch.setattr(pe, "_update_reps", lambda angles: calls.append(angles))
+    second = pe.analyze_frame()
+    assert calls == []
+    assert second.feedback_code == first.feedback_code
+    assert second.quality == first.quality
+
+
+def test_static_hold_still_completes_pending_phase_change(monkeypatch):
+    from app.vision.pipeline import PoseAngles
+
+    pe = PoseEstimator()
+    pe.set_exercise("squat")
+    pe.set_counting_enabled(True)
+    pe.phase = "up"
+    frames = []
+
+    def scripted_frame():
+        angles, static = frames.pop(0)
+        pe._pose_static = static
+        return pe._last_joints, angles, None
+
+    monkeypatch.setattr(pe, "_process_frame", scripted_frame)
+    standing, bottom = PoseAngles(left_knee=170.0, right_knee=170.0), PoseAngles(left_knee=60.0, right_knee=60.0)
+    frames += [(standing, False)] * 5 + [(bottom, False)] + [(bottom, True)] * 10
+    for _ in range(6):
+        pe.analyze_frame()
+    assert pe.phase == "up"  # smoothed angle still above the down threshold when the body stops
+    for _ in range(10):
+        pe.analyze_frame()  # held still at the bottom: smoothing converges and the phase flips
+    assert pe.phase == "down"
+    assert pe._phase_condition_frames == 0
+
+
+def test_angle_kernel_matches_numpy_batch(monkeypatch):
+    import numpy as np
+
+    from app.vision import pipeline
+    from app.vision._angles_jit import _compute_all
+
+    points = _points()
+    del points["right_ankle"]
+    buf = np.array([points.get(n, pipeline._MISSING_POINT)[:3] for n in pipeline._KERNEL_JOINTS], dtype=np.float32)
+    out = np.empty(len(pipeline._ANGLE_TRIPLETS) + 1, dtype=np.float32)
+    _compute_all(buf, pipeline._TRIPLET_IDX, out)
+    monkeypatch.setattr(pipeline, "_jit_compute_all", None)  # force the NumPy batch
+    expected = PoseEstimator()._compute_angles(points)
+    for name, value in zip(pipeline._ANGLE_FIELDS + ("torso_forward",), out.tolist()):
+        want = getattr(expected, name)
+        if want is None:
+            assert math.isnan(value)
+        else:
+            assert value == pytest.approx(want, abs=1e-3)
+
+
+def test_pose_result_to_dict_matches_asdict():
+    from dataclasses import asdict
+
+    result = PoseEstimator().analyze_frame()
+    expected = asdict(result)
+    expected["joints"] = [asdict(j) for j in result.joints]  # SoA columns serialize as per-joint rows
+    assert result.to_dict() == expected
+
+
+def test_pose_joints_soa_rows_and_skeleton_layout():
+    from app.vision import pipeline
+
+    joints = pipeline.PoseJointsSoA.from_rows((("left_knee", 0.5, 0.25, 0.0, 0.9), ("left_hip", 0.5, 0.1, 0.0, 0.8)))
+    assert len(joints) == 2
+    assert list(joints)[1] == pipeline.PoseJoint("left_hip", 0.5, 0.1, 0.0, 0.8)
+    assert joints.to_list()[0] == {"name": "left_knee", "x": 0.5, "y": 0.25, "z": 0.0, "score": 0.9}
+    idx_a, idx_b, line_parts, parts = pipeline._skeleton_layout(joints.names)
+    # connections with a missing joint are dropped
+    assert (idx_a.tolist(), idx_b.tolist(), line_parts) == ([0], [1], ("left_leg",))
+    assert parts == ("left_leg", "left_leg")
+    assert pipeline._skeleton_layout(("right_wrist", "left_hip", "nose"))[3] == ("right_arm", "left_leg", "torso")
+
+
+def test_encode_frame_reuses_cached_jpeg(monkeypatch):
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+    pe = PoseEstimator()
+    joints = pipeline._MOCK_JOINTS
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    angles = pipeline.PoseAngles()
+    first = pe._encode_frame(frame, joints, 50.0, angles)
+    assert first
+    encodes = []
+    monkeypatch.setattr(pipeline.cv2, "imencode", lambda *a, **k: encodes.append(a) or (False, None))
+    assert pe._encode_frame(frame, joints, 50.4, angles) == first
+    assert pe._encode_frame(None, joints, 50.0, angles) == first
+    # Same picture and overlay in new objects: matched by content
+    assert pe._encode_frame(frame.copy(), joints, 50.0, pipeline.PoseAngles()) == first
+    assert encodes == []
+    changed = frame.copy()
+    changed[:] = 40
+    assert pe._encode_frame(changed, joints, 50.0, angles) is None  # new image -> re-encoded
+    moved = pipeline.PoseJointsSoA(joints.names, joints.xyzs + 0.01, joints.scores)
+    assert pe._encode_frame(frame.copy(), moved, 50.0, angles) is None  # skeleton moved -> re-encoded
+    assert len(encodes) == 2
+
+
+def test_hud_key_ignores_subpixel_joint_jitter():
+    import numpy as np
+
+    from app.vision import pipeline
+
+    pe = PoseEstimator()
+    frame, angles, sig = np.zeros((120, 160, 3), dtype=np.uint8), pipeline.PoseAngles(), (50, "squat", "up")
+    base = pipeline._MOCK_JOINTS
+    snapped = (np.floor(base.xyzs * (160, 120, 1)) + (0.3, 0.3, 0)) / (160, 120, 1)
+    joints = pipeline.PoseJointsSoA(base.names, snapped, base.scores)
+    jitter = pipeline.PoseJointsSoA(base.names, snapped + (0.4 / 160, 0.4 / 120, 0.0), base.scores)
+    key = pe._hud_content_key(frame, joints, angles, sig, 160, 120)
+    assert pe._hud_content_key(frame, jitter, angles, sig, 160, 120) == key  # same drawn pixels
+    assert pe._hud_content_key(frame, jitter, angles, sig, 1600, 1200) != pe._hud_content_key(
+        frame, joints, angles, sig, 1600, 1200
+    )
+
+
+def test_encode_hud_draws_on_downscaled_copy(monkeypatch):
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+    pe = PoseEstimator()
+    monkeypatch.setattr(pe.settings, "hud_target_long_side", 480)
+    monkeypatch.setattr(pe.settings, "hud_frame_rotate", 90)
+    frame = np.zeros((540, 960, 3), dtype=np.uint8)
+    jpeg = pe._encode_hud_jpeg(frame, pipeline._MOCK_JOINTS, 50.0, pipeline.PoseAngles())
+    decoded = pipeline.cv2.imdecode(np.frombuffer(jpeg, np.uint8), pipeline.cv2.IMREAD_COLOR)
+    assert decoded.shape[:2] == (480, 270)  # resized to the long side, then rotated
+    assert decoded.max() > 0 and not frame.any()  # skeleton drawn, source frame untouched
+
+
+def test_rotated_joints_match_rotating_the_drawn_frame():
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+    cv2, pe = pipeline.cv2, PoseEstimator()
+    joints, colors = pipeline._MOCK_JOINTS, pe._compute_part_colors(pipeline.PoseAngles())
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    for angle, code in ((90, cv2.ROTATE_90_CLOCKWISE), (180, cv2.ROTATE_180), (270, cv2.ROTATE_90_COUNTERCLOCKWISE)):
+        drawn_then_rotated = cv2.rotate(pe._draw_skeleton(frame.copy(), joints, colors), code).any(axis=2)
+        rotated_then_drawn = pe._draw_skeleton(cv2.rotate(frame, code), pipeline._rotate_joints(joints, angle), colors)
+        overlap = (drawn_then_rotated & rotated_then_drawn.any(axis=2)).sum() / drawn_then_rotated.sum()
+        assert overlap > 0.85  # same skeleton, at most a pixel of rounding apart
+    assert pipeline._rotate_joints(joints, 0) is joints
+
+
+def test_hud_encode_throttled_and_paused_without_readers(monkeypatch):
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+    pe = PoseEstimator()
+    monkeypatch.setattr(pe.settings, "hud_idle_timeout_s", 5.0)
+    pe._hud_fps_target = 10.0
+    joints, angles = pipeline._MOCK_JOINTS, pipeline.PoseAngles()
+    first = pe._encode_hud_jpeg(np.zeros((120, 160, 3), dtype=np.uint8), joints, 50.0, angles)
+    changed = np.full((120, 160, 3), 40, dtype=np.uint8)
+    assert pe._encode_hud_jpeg(changed, joints, 50.0, angles) == first  # within 1/10 s: not encoded
+    pe._last_hud_ts -= 0.2
+    pe._hud_read_ts -= 10.0  # no client read for longer than the idle timeout
+    assert pe._encode_hud_jpeg(changed, joints, 50.0, angles) == first
+    pe.mark_hud_read()
+    assert pe._encode_hud_jpeg(changed, joints, 50.0, angles) != first
+
+
+def test_background_hud_encoder_drops_frames_while_busy(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from app.vision import pipeline
+
+    if pipeline.cv2 is None:
+        pytest.skip("opencv not available")
+    pe = PoseEstimator()
+    pe._hud_executor = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    render = pe._render_hud
+    renders = []
+
+    def slow_render(*args):
+        renders.append(args)
+        release.wait(5)
+        return render(*args)
+
+    monkeypatch.setattr(pe, "_render_hud", slow_render)
+    joints, angles = pipeline._MOCK_JOINTS, pipeline.PoseAngles()
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    assert pe._encode_hud_jpeg(frame, joints, 50.0, angles) is None  # nothing published yet
+    other = np.full((120, 160, 3), 40, dtype=np.uint8)
+    assert pe._encode_hud_jpeg(other, joints, 50.0, angles) is None  # busy: dropped, not queued
+    release.set()
+    pe._hud_future.result(timeout=5)
+    assert len(renders) == 1
+    frame_id, jpeg = pe.get_hud_jpeg()
+    assert frame_id == 1 and jpeg
+    assert pe._encode_hud_jpeg(frame, joints, 50.0, angles) == jpeg  # published inputs are cached
+    pe._hud_executor.shutdown()
+
+
+def test_feedback_uses_worst_part_table():
+    from app.vision.pipeline import PoseAngles
+
+    pe = PoseEstimator()
+    pe.exercise, pe.phase = "squat", "down"
+    # Left knee far above the "down" target, right knee on target: left leg is the red part
+    angles = PoseAngles(left_knee=170.0, right_knee=80.0, torso_forward=5.0)
+    assert pe._feedback_for_angles(angles, pe._primary_angle(angles), 50.0) == (
+        "go_lower_izquierda",
+        "Baja más con la rodilla izquierda",
+    )
+    assert pe._feedback_for_angles(PoseAngles(), None, 50.0) == ("no_skeleton", "No se detecta el cuerpo")
+
+
+def test_primary_angle_rules_and_single_smoothing_step():
+    from app.vision.pipeline import PoseAngles
+
+    pe = PoseEstimator()
+    assert pe._primary_angle(PoseAngles(left_knee=90.0, right_knee=110.0)) == 100.0
+    assert pe._primary_angle(PoseAngles(right_knee=110.0)) == 110.0
+    pe.set_exercise("pushup")
+    assert pe._primary_angle(PoseAngles(left_elbow=90.0, right_elbow=110.0)) == 90.0
+    assert pe._primary_angle(PoseAngles()) is None
+    pe.set_exercise("crunch")
+    assert pe._primary_angle(PoseAngles(shoulder_hip_alignment=120.0)) == 120.0
+    assert pe._primary_angle(PoseAngles(left_hip=100.0, shoulder_hip_alignment=120.0)) == 100.0
+    pe.set_counting_enabled(True)
+    pe.analyze_frame()
+    assert len(pe._angle_window) == 1  # one sample per frame
+
+
+def test_part_colors_memoized_per_angles_and_phase(monkeypatch):
+    from app.vision.pipeline import PoseAngles
+
+    pe = PoseEstimator()
+    calls = []
+    original = pe._part_colors_uncached
+    monkeypatch.setattr(pe, "_part_colors_uncached", lambda a: calls.append(a) or original(a))
+    angles = PoseAngles(left_knee=100.0, right_knee=100.0)
+    first = pe._compute_part_colors(angles)
+    assert pe._compute_part_colors(angles) is first
+    pe.phase = "down" if pe.phase == "up" else "up"
+    pe._compute_part_colors(angles)
+    assert len(calls) == 2
+
+
+def test_part_levels_kernel_cases():
+    import math
+
+    from app.vision._angles_jit import _part_levels, part_levels, part_margin
+
+    nan = math.nan
+    assert part_margin(80.0, 160.0) == 8.0 and part_margin(75.0, 150.0) == 7.5
+    # squat, phase down (target 80, margin 8): left knee 30 off -> red, right knee 10 off -> yellow
+    args = (0, 80.0, 8.0, 110.0, 90.0, nan, nan, 30.0, nan)
+    assert part_levels(*args) == (0, 0, 2, 1, 0)  # torso lean 30 > 25 is within margin
+    # pushup, phase up (target 150): elbows graded, missing torso lean counts as 0 -> 10 off -> yellow
+    args = (1, 150.0, 7.5, nan, nan, 150.0, 100.0, nan, nan)
+    assert part_levels(*args) == (0, 2, 0, 0, 1)
+    # unknown exercise keeps everything green
+    assert part_levels(-1, 160.0, 8.0, 0.0, 0.0, 0.0, 0.0, 90.0, 0.0) == (0, 0, 0, 0, 0)
+    assert tuple(_part_levels(*args)) == tuple(part_levels(*args))
+
+
+def test_part_colors_share_lru_entry_for_near_identical_angles():
+    from app.vision.pipeline import PoseAngles
+
+    pe = PoseEstimator()
+    first = pe._compute_part_colors(PoseAngles(left_knee=100.01, right_knee=99.98))
+    assert pe._compute_part_colors(PoseAngles(left_knee=99.99, right_knee=100.02)) is first
+
+
+def test_thresholds_follow_exercise_changes():
+    pe = PoseEstimator()
+    s = pe.settings
+    assert pe._down_up == (float(s.squat_down_angle), float(s.squat_up_angle))
+    pe.set_exercise("Pushup")
+    assert pe._down_up == (float(s.pushup_down_angle), float(s.pushup_up_angle))
+    pe.reset_session(exercise="crunch")
+    assert pe._down_up == (float(s.crunch_down_angle), float(s.crunch_up_angle))
+    pe.set_exercise("plank")  # unknown exercises keep the squat row, as before
+    assert pe._exer_idx == 0
+
+
+def test_idle_frames_reuse_last_result(monkeypatch):
+    pe = PoseEstimator()
+    monkeypatch.setattr(pe.settings, "pose_idle_skip", 2)
+    calls = []
+    original = pe._process_frame
+    monkeypatch.setattr(pe, "_process_frame", lambda: (calls.append(1), original())[1])
+    monkeypatch.setattr(pe, "_update_reps", lambda angles: pytest.fail("phases must not advance while idle"))
+    results = [pe.analyze_frame() for _ in range(7)]
+    assert len(calls) == 3  # first call, then 1 of every 3
+    assert results[1].frame_id == results[0].frame_id and results[1].timestamp_utc >= results[0].timestamp_utc
+    assert results[0].latency_ms is not None
+    assert results[1].latency_ms is None and results[3].latency_ms is not None  # reused results are marked
+    pe.set_counting_enabled(True)
+    monkeypatch.undo()
+    pe.analyze_frame()
+    assert pe._idle_result is None
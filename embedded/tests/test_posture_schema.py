@@ -26,3 +26,17 @@ async def test_posture_returns_data_without_camera():
     assert "frame_b64" in d
     if d["frame_b64"] is not None:
         assert isinstance(d["frame_b64"], str)
+
+
+@pytest.mark.asyncio
+async def test_posture_frame_serves_raw_jpeg():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        d = (await ac.post("/posture", json={})).json()["data"]
+        r = await ac.get("/posture/frame")
+    if d["frame_id"] is None:
+        assert r.status_code == 204
+        return
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/jpeg"
+    assert r.headers["x-frame-id"] == str(d["frame_id"])
+    assert r.content[:2] == b"\xff\xd8"
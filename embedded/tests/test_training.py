@@ -18,7 +18,9 @@ async def test_training_voice_sample(monkeypatch):
     def fake_save_voice_sample(transcript, intent, audio_path=None, metadata=None):
         paths.append((transcript, intent, audio_path, metadata))
         from pathlib import Path
-        return Path(f"/tmp/{intent}_sample.json")
+
+        from app.training.datasets import SampleRef
+        return SampleRef(Path(f"/tmp/{intent}_sample.json"), "2025-01-01T00:00:00.000000+00:00")
 
     monkeypatch.setattr("app.api.routers.training.save_voice_sample", fake_save_voice_sample)
     monkeypatch.setattr("app.api.routers.training.register_voice_synonym", lambda *args, **kwargs: None)
@@ -42,7 +44,9 @@ async def test_training_pose_sample(monkeypatch):
 
     def fake_save_pose_sample(label, joints, angles, metadata=None):
         from pathlib import Path
-        return Path(f"/tmp/{label}.json")
+
+        from app.training.datasets import SampleRef
+        return SampleRef(Path(f"/tmp/{label}.json"), "2025-01-01T00:00:00.000000+00:00")
 
     monkeypatch.setattr("app.api.routers.training.save_pose_sample", fake_save_pose_sample)
 
@@ -52,3 +56,4 @@ async def test_training_pose_sample(monkeypatch):
     body = resp.json()
     assert body["success"] is True
     assert "path" in body["data"]
+    assert body["data"]["timestamp_utc"] == "2025-01-01T00:00:00.000000+00:00"
@@ -30,22 +30,40 @@ def load_samples(data_dir: Path) -> Tuple[List[str], List[str]]:
     intents: List[str] = []
     if not data_dir.exists():
         raise SystemExit(f"No se encuentra el directorio de datos {data_dir}")
-    files = sorted(data_dir.glob("*.json"))
+    files = sorted([*data_dir.glob("*.jsonl"), *data_dir.glob("*.json")])
     if not files:
         raise SystemExit(f"No hay samples en {data_dir}. Usa record_and_register_voice.py primero.")
     for file in files:
         try:
-            payload = json.loads(file.read_text(encoding="utf-8"))
+            text = file.read_text(encoding="utf-8")
         except Exception as exc:
             logger.warning("No se pudo leer {}: {}", file, exc)
             continue
-        transcript = (payload.get("transcript") or "").strip()
-        intent = payload.get("intent")
-        if not transcript or not intent:
-            logger.warning("Sample {} carece de transcript o intent", file)
-            continue
-        transcripts.append(transcript)
-        intents.append(intent)
+        if file.suffix == ".jsonl":
+            # One sample per line (current format); a bad line (e.g. torn by a crash mid-write)
+            # is skipped on its own instead of discarding the whole day
+            payloads = []
+            for lineno, line in enumerate(text.splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    payloads.append(json.loads(line))
+                except Exception as exc:
+                    logger.warning("Linea {} invalida en {}: {}", lineno, file, exc)
+        else:
+            try:
+                payloads = [json.loads(text)]
+            except Exception as exc:
+                logger.warning("No se pudo leer {}: {}", file, exc)
+                continue
+        for payload in payloads:
+            transcript = (payload.get("transcript") or "").strip()
+            intent = payload.get("intent")
+            if not transcript or not intent:
+                logger.warning("Sample en {} carece de transcript o intent", file)
+                continue
+            transcripts.append(transcript)
+            intents.append(intent)
     if not transcripts:
         raise SystemExit("No se cargaron muestras validas.")
     logger.info("Cargadas {} muestras de {}", len(transcripts), data_dir)